@@ -1,17 +1,17 @@
-import requests
-from bs4 import BeautifulSoup
+from html_parse import LIQUIPEDIA_MATCHES_STRAINER, make_soup
+from http_cache import HttpCache
 
 # Substitute player_name with the desired player's handle
 player_name = "Sacy"  # Replace with the player's handle
 url = f"https://liquipedia.net/valorant/{player_name}/Matches"
 
-# Send a GET request to the website
-response = requests.get(url)
+# Send a GET request to the website (unchanged pages are served from the on-disk cache)
+response = HttpCache().get(url)
 
 # Check if the request was successful (status code 200)
-if response.status_code == 200:
+if response.status == 200:
     # Parse the HTML content
-    soup = BeautifulSoup(response.content, 'html.parser')
+    soup = make_soup(response.body, LIQUIPEDIA_MATCHES_STRAINER)
 
     # Initialize an empty dictionary to store agent counts
     agent_counts = {}
@@ -60,4 +60,4 @@ if response.status_code == 200:
     print(f"Top 3 agents saved to {player_name}_top_3_agents.txt")
 
 else:
-    print(f"Failed to retrieve page. Status code: {response.status_code}")
+    print(f"Failed to retrieve page. Status code: {response.status}")
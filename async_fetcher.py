@@ -0,0 +1,157 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import aiohttp
+from http_cache import FetchResult, HttpCache
+
+# Liquipedia asks for at most one page request every 2 seconds; 2.5 s leaves some headroom
+DEFAULT_HOST_RATES = {"liquipedia.net": 1 / 2.5}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Dropped connections, resets and timeouts are retried with the same backoff as the statuses above
+RETRY_EXCEPTIONS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+
+class TokenBucket:
+    """Allow `rate` requests per second on average, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        """Drain the bucket so nobody on this host sends anything for `seconds`."""
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+        self.updated = time.monotonic()
+
+
+# Function to read a Retry-After header given either as seconds or as an HTTP date
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncFetcher:
+    """Concurrent HTTP GETs with a token bucket per host and a cap on in-flight requests."""
+
+    def __init__(self, max_in_flight: int = 4, host_rates: Dict[str, float] = None,
+                 default_rate: float = 1.0, max_retries: int = 5,
+                 backoff_base: float = 2.0, backoff_max: float = 120.0,
+                 headers: Dict[str, str] = None, cache: HttpCache = None):
+        self.host_rates = {**DEFAULT_HOST_RATES, **(host_rates or {})}
+        self.default_rate = default_rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.headers = headers or {"User-Agent": "vct-hackathon-scraper (player stats research)"}
+        self.cache = cache
+        self.request_counts = Counter()  # Requests actually sent, per host
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(headers=self.headers)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.host_rates.get(host, self.default_rate))
+        return self._buckets[host]
+
+    # Function to work out how long to wait before retry number `attempt`
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = random.uniform(delay / 2, delay)  # Jitter so retries don't line up
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def fetch(self, url: str, headers: Dict[str, str] = None) -> FetchResult:
+        """GET a URL through the cache, waiting for the host's rate limit and retrying 429/5xx and
+        connection errors. The cache's file I/O runs in worker threads, off the event loop."""
+        if self.cache is None:
+            return await self._fetch_network(url, headers)
+
+        # Fresh cache entries never touch the network (or the rate limit)
+        meta = await asyncio.to_thread(self.cache.lookup, url)
+        if meta and self.cache.is_fresh(meta):
+            body = await asyncio.to_thread(self.cache.read_body, url)
+            if body is not None:
+                return FetchResult(url, 200, body, {})
+
+        result = await self._fetch_network(url, {**(headers or {}), **self.cache.conditional_headers(meta)})
+        if result.status == 304 and meta:
+            body = await asyncio.to_thread(self.cache.read_body, url)
+            if body is not None:
+                await asyncio.to_thread(self.cache.refresh, url)
+                return FetchResult(url, 200, body, result.headers)
+            result = await self._fetch_network(url, headers)  # Cached body went missing
+
+        if result.status == 200:
+            await asyncio.to_thread(self.cache.store, url, result.body, result.headers)
+        return result
+
+    async def _fetch_network(self, url: str, headers: Dict[str, str] = None) -> FetchResult:
+        host = urlsplit(url).hostname
+        bucket = self._bucket(host)
+
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            try:
+                async with self._in_flight:
+                    self.request_counts[host] += 1
+                    async with self._session.get(url, headers=headers) as response:
+                        body = await response.read()
+                        result = FetchResult(url, response.status, body, dict(response.headers))
+                        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            except RETRY_EXCEPTIONS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt, None)
+                print(f"{type(e).__name__} from {host}, retrying {url} in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                continue
+
+            if result.status not in RETRY_STATUSES or attempt == self.max_retries:
+                return result
+
+            delay = self._backoff(attempt, retry_after)
+            print(f"HTTP {result.status} from {host}, retrying {url} in {delay:.1f}s...")
+            if result.status == 429:
+                bucket.pause(delay)  # Slow the whole host down, not just this request
+            await asyncio.sleep(delay)
+
+        return result
+
+    async def fetch_all(self, urls: List[str]) -> List[FetchResult]:
+        """Fetch many URLs concurrently; results come back in the same order as `urls`."""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
@@ -0,0 +1,171 @@
+"""Offline benchmark and regression check for the scraper extractors.
+
+Replays saved vlr.gg / Liquipedia pages through every extractor, reports pages/sec, per-page
+latency percentiles and peak memory, and compares the extracted values with golden outputs.
+
+    python bench_extract.py                    # benchmark + compare against golden.json
+    python bench_extract.py --update-golden    # accept the current output as golden
+    VCT_HTML_PARSER=html.parser python bench_extract.py   # compare parser backends
+"""
+import argparse
+import ast
+import glob
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+import html_parse
+from html_parse import VLR_PROFILE_STRAINER, make_soup
+from liquipedia_extract import parse_top_agents
+from vlr_extract import (calculate_column_averages, extract_country, extract_player_profile, extract_rating_kast,
+                         extract_top_agents)
+
+# LangChain Document dumps like html.html hold several pages as repr'd strings
+DOCUMENT_RE = re.compile(r"Document\(metadata=(\{.*?\}), page_content=('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")\)", re.S)
+
+DEFAULT_CORPUS = ['html.html', 'test-data/pages/*.html']
+DEFAULT_GOLDEN = 'test-data/pages/golden.json'
+
+
+# Function to load every page of the corpus as (name, kind, html)
+def load_corpus(patterns: List[str]) -> List[Tuple[str, str, str]]:
+    pages = []
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, 'r', encoding='utf-8', errors='replace') as file:
+                content = file.read()
+
+            documents = DOCUMENT_RE.findall(content)
+            if documents:
+                for metadata, page_content in documents:
+                    source = ast.literal_eval(metadata).get('source', path)
+                    pages.append((source, ast.literal_eval(page_content)))
+            else:
+                pages.append((path, content))
+
+    corpus = []
+    for name, html in pages:
+        if 'recent-matches-bg-' in html:
+            corpus.append((name, 'liquipedia', html))
+        elif 'wf-table' in html or 'vlr.gg' in name:
+            corpus.append((name, 'vlr', html))
+    return corpus
+
+
+# Each extractor takes the raw page and returns something JSON-serialisable
+def _vlr_soup(html):
+    return make_soup(html, VLR_PROFILE_STRAINER)
+
+
+VLR_EXTRACTORS: Dict[str, Callable[[str], object]] = {
+    'top_agents': lambda html: extract_top_agents(_vlr_soup(html)),
+    'rating_kast': lambda html: list(extract_rating_kast(_vlr_soup(html))),
+    'country': lambda html: extract_country(_vlr_soup(html)),
+    'column_averages': lambda html: [round(value, 4) for value in calculate_column_averages(_vlr_soup(html))],
+    'player_profile': extract_player_profile,
+}
+LIQUIPEDIA_EXTRACTORS: Dict[str, Callable[[str], object]] = {
+    'top_agents': parse_top_agents,
+}
+
+
+# Function to return the value at a given percentile of a sorted list
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def run_benchmark(corpus, repeat: int = 5):
+    """Run every extractor over the corpus `repeat` times; returns (outputs, stats per extractor)."""
+    outputs = {}
+    stats = {}
+    for kind, extractors in (('vlr', VLR_EXTRACTORS), ('liquipedia', LIQUIPEDIA_EXTRACTORS)):
+        pages = [(name, html) for name, page_kind, html in corpus if page_kind == kind]
+        if not pages:
+            continue
+        for extractor_name, extract in extractors.items():
+            key = f"{kind}.{extractor_name}"
+            latencies = []
+            for _ in range(repeat):
+                for name, html in pages:
+                    start = time.perf_counter()
+                    value = extract(html)
+                    latencies.append(time.perf_counter() - start)
+                    outputs.setdefault(name, {})[key] = value
+
+            # Peak memory comes from a separate pass; tracemalloc slows allocation down a lot
+            tracemalloc.start()
+            for _, html in pages:
+                extract(html)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            latencies.sort()
+            stats[key] = {
+                'pages': len(latencies),
+                'pages_per_sec': len(latencies) / sum(latencies),
+                'p50_ms': percentile(latencies, 50) * 1000,
+                'p90_ms': percentile(latencies, 90) * 1000,
+                'p99_ms': percentile(latencies, 99) * 1000,
+                'peak_mb': peak / (1024 * 1024),
+            }
+    return outputs, stats
+
+
+# Function to list every (page, extractor) whose output differs from the golden file
+def compare_golden(outputs, golden) -> List[str]:
+    mismatches = []
+    for name, values in outputs.items():
+        for key, value in values.items():
+            expected = golden.get(name, {}).get(key)
+            if json.loads(json.dumps(value)) != expected:
+                mismatches.append(f"{name} [{key}]: expected {expected!r}, got {value!r}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', nargs='+', default=DEFAULT_CORPUS, help="files or globs of saved pages")
+    parser.add_argument('--golden', default=DEFAULT_GOLDEN, help="golden outputs JSON")
+    parser.add_argument('--repeat', type=int, default=5, help="passes over the corpus per extractor")
+    parser.add_argument('--update-golden', action='store_true', help="write the current outputs as golden")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        sys.exit("No pages found in the corpus")
+    print(f"{len(corpus)} pages, parser={html_parse.PARSER_BACKEND}, scoped={html_parse.SCOPED_PARSING}\n")
+
+    outputs, stats = run_benchmark(corpus, args.repeat)
+    print(f"{'extractor':<28}{'pages/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'peak MB':>10}")
+    for key, row in stats.items():
+        print(f"{key:<28}{row['pages_per_sec']:>10.1f}{row['p50_ms']:>10.2f}{row['p90_ms']:>10.2f}"
+              f"{row['p99_ms']:>10.2f}{row['peak_mb']:>10.2f}")
+
+    if args.update_golden:
+        os.makedirs(os.path.dirname(args.golden) or '.', exist_ok=True)
+        with open(args.golden, 'w', encoding='utf-8') as file:
+            json.dump(outputs, file, indent=2, ensure_ascii=False, sort_keys=True)
+        print(f"\nGolden outputs written to {args.golden}")
+        return
+
+    if not os.path.exists(args.golden):
+        sys.exit(f"\nNo golden file at {args.golden}; run with --update-golden first")
+    with open(args.golden, 'r', encoding='utf-8') as file:
+        golden = json.load(file)
+    mismatches = compare_golden(outputs, golden)
+    if mismatches:
+        print(f"\n{len(mismatches)} mismatches against {args.golden}:")
+        for mismatch in mismatches:
+            print(f"  {mismatch}")
+        sys.exit(1)
+    print(f"\nAll outputs match {args.golden}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,75 @@
+import argparse
 import json
-from typing import Dict, List, Any
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, TextIO
+import json_loader
+
+REFERENCE_FILES = ['players', 'teams', 'tournaments', 'leagues', 'mapping_data']
+
+try:
+    import ijson  # C-backed incremental parser, used when installed
+except ImportError:
+    ijson = None
 
 def load_json(file_path: str) -> List[Dict[str, Any]]:
+    return json_loader.load_json(file_path)
+
+# Function to load the five reference files concurrently (decoded objects are cached by mtime + size)
+def load_reference_data(data_dir: str = 'test-data') -> Dict[str, List[Dict[str, Any]]]:
+    return json_loader.load_json_files({name: f"{data_dir}/{name}.json" for name in REFERENCE_FILES})
+
+# Function to yield the items of a top-level JSON array one at a time, without loading the whole file
+def iter_json_array(file_path: str, chunk_size: int = 1 << 20) -> Iterator[Any]:
+    if ijson is not None:
+        with open(file_path, 'rb') as file:
+            yield from ijson.items(file, 'item', use_float=True)
+        return
+
+    decoder = json.JSONDecoder()
     with open(file_path, 'r', encoding='utf-8') as file:
-        return json.load(file)
+        buffer = file.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{file_path} is not a JSON array")
+        position = 1
+        eof = False
+        while True:
+            # Skip the separators between items
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The next item runs past the end of the buffer, read more and retry
+                chunk = file.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield item
+            position = end
 
-def create_combined_json():
-    players = load_json(r'test-data\players.json')
-    teams = load_json(r'test-data\teams.json')
-    tournaments = load_json(r'test-data\tournaments.json')
-    leagues = load_json(r'test-data\leagues.json')
-    mapping_data = load_json(r'test-data\mapping_data.json')
+# Function to map every player id to the tournament ids it was mapped in, in one pass over mapping_data
+def build_participant_index(mapping_data: Iterable[Dict[str, Any]]) -> Dict[Any, List[Any]]:
+    player_tournaments = defaultdict(list)
+    for mapping in mapping_data:
+        tournament_id = mapping['tournamentId']
+        for mapped_player_id in mapping['participantMapping'].values():
+            player_tournaments[mapped_player_id].append(tournament_id)
+    return player_tournaments
 
+def combine_players(players: Iterable[Dict[str, Any]], teams: Iterable[Dict[str, Any]],
+                    tournaments: Iterable[Dict[str, Any]], leagues: Iterable[Dict[str, Any]],
+                    mapping_data: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Yield one combined player record per player; the inputs may be lists or streams."""
     # Create dictionaries for faster lookup
     teams_dict = {team['id']: team for team in teams}
     tournaments_dict = {t['id']: t for t in tournaments}
     leagues_dict = {l['league_id']: l for l in leagues}
-
-    combined_data = []
+    player_tournaments = build_participant_index(mapping_data)
 
     for player in players:
         player_data = {
@@ -36,26 +88,63 @@ def create_combined_json():
             if 'home_league_id' in team and team['home_league_id'] in leagues_dict:
                 player_data["league"] = leagues_dict[team['home_league_id']]
 
-        # Find tournaments and additional mappings
-        for mapping in mapping_data:
-            for participant_id, mapped_player_id in mapping['participantMapping'].items():
-                if mapped_player_id == player['id']:
-                    if mapping['tournamentId'] in tournaments_dict:
-                        tournament = tournaments_dict[mapping['tournamentId']]
-                        player_data["tournaments"].append(tournament)
-                        
-                        # If league not found earlier, try to find it through tournament
-                        if not player_data["league"] and 'league_id' in tournament:
-                            if tournament['league_id'] in leagues_dict:
-                                player_data["league"] = leagues_dict[tournament['league_id']]
-
-        combined_data.append(player_data)
-
-    return combined_data
-
-# Create and save the combined JSON
-combined_json = create_combined_json()
-with open('combined_data.json', 'w', encoding='utf-8') as outfile:
-    json.dump(combined_json, outfile, indent=2, ensure_ascii=False)
-
-print("Combined JSON file has been created as 'combined_data.json'")
\ No newline at end of file
+        # Find tournaments the player was mapped in
+        for tournament_id in player_tournaments.get(player['id'], ()):
+            if tournament_id in tournaments_dict:
+                tournament = tournaments_dict[tournament_id]
+                player_data["tournaments"].append(tournament)
+
+                # If league not found earlier, try to find it through tournament
+                if not player_data["league"] and 'league_id' in tournament:
+                    if tournament['league_id'] in leagues_dict:
+                        player_data["league"] = leagues_dict[tournament['league_id']]
+
+        yield player_data
+
+def iter_combined_players(data_dir: str = 'test-data') -> Iterator[Dict[str, Any]]:
+    """Stream the reference files from disk and yield one combined player record at a time. Only the
+    team / tournament / league lookups and the participant index are held in memory."""
+    streams = {name: iter_json_array(f"{data_dir}/{name}.json") for name in REFERENCE_FILES}
+    return combine_players(**streams)
+
+def create_combined_json(data_dir: str = 'test-data') -> List[Dict[str, Any]]:
+    return list(combine_players(**load_reference_data(data_dir)))
+
+def write_combined(records: Iterable[Dict[str, Any]], outfile: TextIO, output_format: str = 'ndjson') -> int:
+    """Write records as they are produced: 'ndjson' (one per line), 'json' (compact array) or
+    'pretty' (indented array, the old combined_data.json layout). Returns how many were written."""
+    if output_format not in ('ndjson', 'json', 'pretty'):
+        raise ValueError(f"Unknown output format: {output_format}")
+    indent = 2 if output_format == 'pretty' else None
+    separators = None if indent else (',', ':')
+
+    count = 0
+    if output_format != 'ndjson':
+        outfile.write('[')
+    for record in records:
+        if output_format == 'ndjson':
+            outfile.write(json.dumps(record, ensure_ascii=False, separators=separators))
+            outfile.write('\n')
+        else:
+            outfile.write(',' if count else '')
+            outfile.write('\n  ' if indent else '')
+            text = json.dumps(record, indent=indent, ensure_ascii=False, separators=separators)
+            outfile.write(text.replace('\n', '\n  ') if indent else text)
+        count += 1
+    if output_format != 'ndjson':
+        outfile.write('\n]' if indent and count else ']')
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Combine players, teams, tournaments and leagues per player")
+    parser.add_argument('--data-dir', default='test-data', help="directory holding the five reference files")
+    parser.add_argument('--format', choices=['ndjson', 'json', 'pretty'], default='ndjson', dest='output_format')
+    parser.add_argument('--output', help="defaults to combined_data.ndjson / combined_data.json")
+    args = parser.parse_args()
+
+    output_path = args.output or ('combined_data.ndjson' if args.output_format == 'ndjson' else 'combined_data.json')
+    # Create and save the combined JSON one player at a time
+    with open(output_path, 'w', encoding='utf-8') as outfile:
+        written = write_combined(iter_combined_players(args.data_dir), outfile, args.output_format)
+
+    print(f"Combined JSON file has been created as '{output_path}' ({written} players)")
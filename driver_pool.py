@@ -0,0 +1,160 @@
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+from selenium import webdriver
+from selenium.common.exceptions import (
+    ElementClickInterceptedException, InvalidArgumentException, InvalidElementStateException, InvalidSelectorException,
+    JavascriptException, MoveTargetOutOfBoundsException, NoSuchAttributeException, NoSuchElementException,
+    StaleElementReferenceException, TimeoutException, UnexpectedAlertPresentException, WebDriverException,
+)
+
+# Errors about the page (an element that isn't there, a wait that ran out, a bad script), after which
+# the browser itself is still fine to reuse
+PAGE_ERRORS = (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException, InvalidElementStateException,
+    ElementClickInterceptedException, InvalidSelectorException, JavascriptException, NoSuchAttributeException,
+    InvalidArgumentException, UnexpectedAlertPresentException, MoveTargetOutOfBoundsException,
+)
+
+
+# Function to tell a dead or broken browser session apart from an ordinary "not on this page" error
+def browser_died(error: BaseException) -> bool:
+    return isinstance(error, WebDriverException) and not isinstance(error, PAGE_ERRORS)
+
+
+class _PooledDriver:
+    """A browser owned by the pool plus the number of pages it has served."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class DriverPool:
+    """Keep a few warm Chrome instances and hand them out one player at a time."""
+
+    def __init__(self, size: int = 1, max_pages: int = 50,
+                 driver_factory: Optional[Callable[[], webdriver.Chrome]] = None):
+        self.size = size
+        self.max_pages = max_pages  # Recycle a browser after this many players
+        self.driver_factory = driver_factory or webdriver.Chrome
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._all = []
+        self._closed = False
+
+    # Function to start a browser and register it with the pool
+    def _new_driver(self) -> _PooledDriver:
+        pooled = _PooledDriver(self.driver_factory())
+        with self._lock:
+            self._all.append(pooled)
+        return pooled
+
+    # Function to quit a browser and free its slot
+    def _discard(self, pooled: _PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass  # The browser may already be dead
+        with self._lock:
+            if pooled in self._all:
+                self._all.remove(pooled)
+            self._created -= 1
+
+    # Function to clear cookies and page state so the next player starts clean
+    def _reset(self, pooled: _PooledDriver):
+        driver = pooled.driver
+        driver.delete_all_cookies()
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except WebDriverException:
+            pass  # Storage is not available on some pages (e.g. data: URLs)
+        driver.get("about:blank")
+
+    def warm(self):
+        """Start every browser up front so the first players don't pay for Chrome boot."""
+        started = []
+        while True:
+            with self._lock:
+                if self._created >= self.size:
+                    break
+                self._created += 1
+            started.append(self._new_driver())
+        for pooled in started:
+            self._idle.put(pooled)
+
+    def _acquire(self) -> _PooledDriver:
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            # Start a new browser if we are below the pool size, otherwise wait for one
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    return self._new_driver()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue  # A recycled browser may have freed a slot
+
+    def _release(self, pooled: _PooledDriver, crashed: bool):
+        pooled.pages += 1
+        if crashed or self._closed or pooled.pages >= self.max_pages:
+            self._discard(pooled)
+            return
+        try:
+            self._reset(pooled)
+        except WebDriverException:
+            self._discard(pooled)  # Browser died while resetting
+            return
+        self._idle.put(pooled)
+
+    @contextmanager
+    def driver(self) -> Iterator[webdriver.Chrome]:
+        """Borrow a browser for one player; it is reset (or recycled) on return."""
+        pooled = self._acquire()
+        crashed = False
+        try:
+            yield pooled.driver
+        except WebDriverException as e:
+            # Don't trust a browser whose session broke, start a fresh one next time; page errors
+            # such as a WebDriverWait timing out leave it reusable
+            crashed = browser_died(e)
+            raise
+        finally:
+            self._release(pooled, crashed)
+
+    def close(self):
+        """Quit every browser owned by the pool."""
+        self._closed = True
+        with self._lock:
+            pooled_drivers = list(self._all)
+        for pooled in pooled_drivers:
+            self._discard(pooled)
+
+
+_default_pool = None
+
+
+def get_default_pool() -> DriverPool:
+    """Return a process-wide pool, created on first use and closed at exit."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = DriverPool()
+        atexit.register(_default_pool.close)
+    return _default_pool
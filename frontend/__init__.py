@@ -0,0 +1 @@
+"""Streamlit front ends and the text-cleaning helpers shared with the data scripts."""
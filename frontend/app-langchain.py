@@ -2,17 +2,35 @@ import streamlit as st
 import pandas as pd
 import boto3
 import json
-from typing import List
+from typing import Callable, Dict, Iterator, List, Optional
 import numpy as np
 from io import StringIO
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from botocore.config import Config
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+from embedding_cache import DEFAULT_PATH, EmbeddingCache, text_digest
 
 # AWS Configuration
 AWS_ACCESS_KEY = ""
 AWS_SECRET_KEY = ""
 AWS_REGION = "us-east-1"  # Change to your region
 
+# Embedding pipeline: parallel invoke_model calls, retried with backoff when throttled
+EMBEDDING_WORKERS = 8
+EMBEDDING_RETRIES = 5
+EMBEDDING_BACKOFF = 0.5  # seconds, doubled on every retry
+EMBEDDING_CACHE_PATH = DEFAULT_PATH  # set to None to always call Bedrock
+EMBEDDING_CACHE_BATCH = 50  # new embeddings written to the cache per commit
+RETRYABLE_ERRORS = {'ThrottlingException', 'TooManyRequestsException', 'ServiceUnavailableException',
+                    'ModelNotReadyException', 'InternalServerException'}
+# Network failures, retried the same way: EndpointConnectionError and ConnectTimeoutError are
+# ConnectionErrors, ReadTimeoutError and ConnectionClosedError are HTTPClientErrors
+RETRYABLE_EXCEPTIONS = (BotoConnectionError, HTTPClientError)
+
 # Configure AWS client with retry strategy
 aws_config = Config(
     region_name=AWS_REGION,
@@ -21,34 +39,100 @@ aws_config = Config(
     )
 )
 
+# The embedding client makes a single attempt per call: _embed owns the retries (with jittered
+# backoff), so botocore's own retries don't multiply them
+embedding_config = aws_config.merge(Config(
+    retries = dict(
+        total_max_attempts = 1
+    ),
+    max_pool_connections = EMBEDDING_WORKERS
+))
+
 class BedrockEmbeddings:
-    def __init__(self, model_id="amazon.titan-embed-text-v1"):
+    def __init__(self, model_id="amazon.titan-embed-text-v1", cache_path=EMBEDDING_CACHE_PATH):
         self.bedrock = boto3.client(
             'bedrock-runtime',
             aws_access_key_id=AWS_ACCESS_KEY,
             aws_secret_access_key=AWS_SECRET_KEY,
             region_name=AWS_REGION,
-            config=aws_config
+            config=embedding_config
         )
         self.model_id = model_id
+        self.cache = EmbeddingCache(cache_path) if cache_path else None
+        self.failures = []
+        self.cache_hits = 0
 
-    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
-        embeddings = []
-        for text in texts:
+    def _embed(self, text: str) -> List[float]:
+        """Embed one (already encoded) text, backing off and retrying while Bedrock throttles or the
+        connection fails"""
+        body = json.dumps({"inputText": text})
+        for attempt in range(EMBEDDING_RETRIES + 1):
             try:
-                # Ensure text is properly encoded
-                text = text.encode('latin-1', errors='ignore').decode('latin-1')
-                body = json.dumps({"inputText": text})
                 response = self.bedrock.invoke_model(
                     modelId=self.model_id,
                     body=body
                 )
                 response_body = json.loads(response['body'].read())
-                embedding = response_body['embedding']
-                embeddings.append(embedding)
-            except Exception as e:
-                st.error(f"Error getting embeddings: {str(e)}")
-                raise
+                return response_body['embedding']
+            except (ClientError, *RETRYABLE_EXCEPTIONS) as e:
+                retryable = (isinstance(e, RETRYABLE_EXCEPTIONS)
+                             or e.response.get('Error', {}).get('Code') in RETRYABLE_ERRORS)
+                if not retryable or attempt == EMBEDDING_RETRIES:
+                    raise
+                # Exponential backoff with jitter so the workers don't retry in lockstep
+                time.sleep(EMBEDDING_BACKOFF * (2 ** attempt) * (0.5 + random.random()))
+
+    def get_embeddings(self, texts: List[str], max_workers: int = EMBEDDING_WORKERS,
+                       progress: Callable[[int, int], None] = None) -> List[Optional[List[float]]]:
+        """Embed texts concurrently, in input order.
+
+        Texts already in the embedding cache (same model, same sha256) and repeats within the call
+        are not sent to Bedrock; self.cache_hits counts the rows served from the cache. A text
+        that still fails after its retries gets None and is recorded in self.failures as
+        (index, error), so one bad row doesn't lose the rest. progress(done, total) is called
+        from the calling thread as results come in.
+        """
+        # Ensure text is properly encoded, then address every row by its content
+        texts = [text.encode('latin-1', errors='ignore').decode('latin-1') for text in texts]
+        digests = [text_digest(text) for text in texts]
+        indexes: Dict[str, List[int]] = {}
+        for index, digest in enumerate(digests):
+            indexes.setdefault(digest, []).append(index)
+
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        cached = self.cache.get_many(self.model_id, indexes) if self.cache else {}
+        for digest, embedding in cached.items():
+            for index in indexes[digest]:
+                embeddings[index] = embedding
+        self.cache_hits = sum(len(indexes[digest]) for digest in cached)
+        self.failures = []
+        done = self.cache_hits
+        if progress and done:
+            progress(done, len(texts))
+
+        misses = [digest for digest in indexes if digest not in cached]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._embed, texts[indexes[digest][0]]): digest for digest in misses}
+            fresh = []
+            for future in as_completed(futures):
+                digest = futures[future]
+                try:
+                    embedding = future.result()
+                    fresh.append((digest, embedding))
+                    for index in indexes[digest]:
+                        embeddings[index] = embedding
+                except Exception as e:
+                    self.failures.extend((index, str(e)) for index in indexes[digest])
+                done += len(indexes[digest])
+                # Save as we go, so an interrupted run keeps what it already paid for
+                if self.cache and len(fresh) >= EMBEDDING_CACHE_BATCH:
+                    self.cache.put_many(self.model_id, fresh)
+                    fresh = []
+                if progress:
+                    progress(done, len(texts))
+            if self.cache:
+                self.cache.put_many(self.model_id, fresh)
+        self.failures.sort()
         return embeddings
 
 class BedrockLLM:
@@ -62,22 +146,23 @@ class BedrockLLM:
         )
         self.model_id = model_id
 
+    def _body(self, prompt: str, context: str) -> str:
+        # Ensure text is properly encoded
+        prompt = prompt.encode('latin-1', errors='ignore').decode('latin-1')
+        context = context.encode('latin-1', errors='ignore').decode('latin-1')
+        
+        return json.dumps({
+            "prompt": f"\n\nHuman: Given the following context:\n{context}\n\nAnswer this question: {prompt}\n\nAssistant:",
+            "max_tokens_to_sample": 500,
+            "temperature": 0.7,
+            "stop_sequences": ["\n\nHuman:"]
+        })
+
     def generate(self, prompt: str, context: str) -> str:
         try:
-            # Ensure text is properly encoded
-            prompt = prompt.encode('latin-1', errors='ignore').decode('latin-1')
-            context = context.encode('latin-1', errors='ignore').decode('latin-1')
-            
-            body = json.dumps({
-                "prompt": f"\n\nHuman: Given the following context:\n{context}\n\nAnswer this question: {prompt}\n\nAssistant:",
-                "max_tokens_to_sample": 500,
-                "temperature": 0.7,
-                "stop_sequences": ["\n\nHuman:"]
-            })
-            
             response = self.bedrock.invoke_model(
                 modelId=self.model_id,
-                body=body
+                body=self._body(prompt, context)
             )
             response_body = json.loads(response['body'].read())
             return response_body['completion']
@@ -85,6 +170,25 @@ class BedrockLLM:
             st.error(f"Error generating response: {str(e)}")
             raise
 
+    def generate_stream(self, prompt: str, context: str) -> Iterator[str]:
+        """Yield the completion piece by piece as the model produces it"""
+        try:
+            response = self.bedrock.invoke_model_with_response_stream(
+                modelId=self.model_id,
+                body=self._body(prompt, context)
+            )
+            for event in response['body']:
+                if 'chunk' not in event:
+                    continue
+                chunk = json.loads(event['chunk']['bytes'])
+                # Text completion models send "completion", Mistral models send "outputs"
+                text = chunk.get('completion') or ''.join(output.get('text', '') for output in chunk.get('outputs', []))
+                if text:
+                    yield text
+        except Exception as e:
+            st.error(f"Error generating response: {str(e)}")
+            raise
+
 def cosine_similarity(a, b):
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
@@ -106,6 +210,12 @@ def clean_text(text):
     """Clean and encode text to ensure compatibility"""
     return text.encode('latin-1', errors='ignore').decode('latin-1')
 
+def format_value(value):
+    """Render a cell the way the CSVs write it (list columns from the parquet become "a, b, c")"""
+    if isinstance(value, (list, np.ndarray)):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
 def main():
     st.title("📚 RAG ChatBot with AWS Bedrock")
     
@@ -144,14 +254,18 @@ def main():
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = []
 
-    st.write("Upload a CSV file and ask questions about its contents!")
+    st.write("Upload a CSV file (or the compiled players.parquet) and ask questions about its contents!")
 
     # File upload
-    uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
+    uploaded_file = st.file_uploader("Choose a CSV file", type=["csv", "parquet"])
     if uploaded_file is not None:
         try:
-            # Read and process the CSV file with latin-1 encoding
-            df = pd.read_csv(uploaded_file, encoding='latin-1')
+            if uploaded_file.name.endswith('.parquet'):
+                # Typed dataset from player_dataset.py, no re-parsing needed
+                df = pd.read_parquet(uploaded_file)
+            else:
+                # Read and process the CSV file with latin-1 encoding
+                df = pd.read_csv(uploaded_file, encoding='latin-1')
             
             if st.button("Process CSV"):
                 with st.spinner("Processing CSV file..."):
@@ -160,16 +274,35 @@ def main():
                         chunks = []
                         for _, row in df.iterrows():
                             # Clean and encode each value
-                            cleaned_row = {k: clean_text(str(v)) for k, v in row.items()}
+                            cleaned_row = {k: clean_text(format_value(v)) for k, v in row.items()}
                             chunk = " ".join([f"{col}: {val}" for col, val in cleaned_row.items()])
                             chunks.append(chunk)
                         
-                        # Get embeddings for chunks
-                        chunk_embeddings = st.session_state.embeddings_model.get_embeddings(chunks)
+                        # Get embeddings for chunks, several requests at a time
+                        progress_bar = st.progress(0.0, text="Embedding rows...")
+                        embeddings_model = st.session_state.embeddings_model
+                        chunk_embeddings = embeddings_model.get_embeddings(
+                            chunks,
+                            progress=lambda done, total: progress_bar.progress(
+                                done / total, text=f"Embedded {done}/{total} rows"
+                            )
+                        )
+                        progress_bar.empty()
+                        if embeddings_model.cache_hits:
+                            st.info(f"{embeddings_model.cache_hits} of {len(chunks)} rows were already embedded "
+                                    f"and came from the cache")
+                        
+                        # Rows that failed every retry are left out instead of failing the whole file
+                        if embeddings_model.failures:
+                            st.warning(f"{len(embeddings_model.failures)} rows could not be embedded and were skipped "
+                                       f"(first error: {embeddings_model.failures[0][1]})")
+                        kept = [index for index, embedding in enumerate(chunk_embeddings) if embedding is not None]
+                        if not kept:
+                            raise RuntimeError("No rows could be embedded")
                         
                         # Store in session state
-                        st.session_state.chunks = chunks
-                        st.session_state.chunk_embeddings = chunk_embeddings
+                        st.session_state.chunks = [chunks[index] for index in kept]
+                        st.session_state.chunk_embeddings = [chunk_embeddings[index] for index in kept]
                         st.success("CSV processed successfully!")
                     except Exception as e:
                         st.error(f"Error processing CSV: {str(e)}")
@@ -192,13 +325,15 @@ def main():
         if st.session_state.chunks is None:
             st.error("Please upload and process a CSV file first!")
         else:
-            with st.spinner("Thinking..."):
-                try:
+            try:
+                with st.spinner("Thinking..."):
                     # Clean and encode query
                     query = clean_text(query)
                     
                     # Get query embedding
                     query_embedding = st.session_state.embeddings_model.get_embeddings([query])[0]
+                    if query_embedding is None:
+                        raise RuntimeError(st.session_state.embeddings_model.failures[0][1])
                     
                     # Get relevant chunks
                     relevant_chunks = get_most_similar_chunks(
@@ -209,17 +344,23 @@ def main():
                     
                     # Combine chunks into context
                     context = "\n".join(relevant_chunks)
-                    
-                    # Generate response using LLM
-                    response = st.session_state.llm.generate(query, context)
-                    
-                    # Update chat history
-                    st.session_state.chat_history.append((query, response))
-                    
-                    # Force refresh
-                    st.experimental_rerun()
-                except Exception as e:
-                    st.error(f"Error processing query: {str(e)}")
+                
+                # Stream the response into the chat as the LLM generates it
+                with st.chat_message("assistant"):
+                    placeholder = st.empty()
+                    response = ""
+                    for text in st.session_state.llm.generate_stream(query, context):
+                        response += text
+                        placeholder.markdown(clean_text(response) + "▌")
+                    placeholder.markdown(clean_text(response))
+                
+                # Update chat history
+                st.session_state.chat_history.append((query, response))
+                
+                # Force refresh
+                st.experimental_rerun()
+            except Exception as e:
+                st.error(f"Error processing query: {str(e)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,29 +1,82 @@
+import os
+import sys
 import boto3
 import streamlit as st
 
+# Run as `streamlit run frontend/app.py`; the data helpers live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from player_prefilter import get_default_filter_index
+from response_cache import get_default_response_cache, response_key
+from team_optimiser import describe_roster, get_default_optimiser
+
 # Create a Bedrock client
 bedrockClient = boto3.client('bedrock-agent-runtime', 'us-east-1')
+CANDIDATE_RETRIEVAL_RESULTS = 3
+knowledgeBaseId = 'knowledgebaseID' #from secrets.toml do input
+modelArn = 'modelArn' #from secrets.toml - model used: mistral-large-2402-v1:0
 
-# Function to get answers from Bedrock using the knowledge base with a system prompt
-def getAnswers(questions, system_prompt):
-    # Combine system prompt with the question
+# Function to build the retrieve_and_generate request: system prompt + question (+ pre-filtered players)
+def knowledgeBaseRequest(questions, system_prompt, candidates=None):
     combined_input = f"{system_prompt}\n\n{questions}"
-    
-    knowledgeBaseResponse = bedrockClient.retrieve_and_generate(
-        input={'text': combined_input},
-        retrieveAndGenerateConfiguration={
-            'knowledgeBaseConfiguration': {
-                'knowledgeBaseId': 'knowledgebaseID', #from secrets.toml do input
-                'modelArn': 'modelArn' #from secrets.toml - model used: mistral-large-2402-v1:0
-            },
+    knowledgeBaseConfiguration = {
+        'knowledgeBaseId': knowledgeBaseId,
+        'modelArn': modelArn
+    }
+    if candidates:
+        combined_input += f"\n\nOnly choose from these players (CSV):\n{candidates}"
+        # The candidate rows already hold the data, so a few knowledge-base passages are enough
+        knowledgeBaseConfiguration['retrievalConfiguration'] = {
+            'vectorSearchConfiguration': {'numberOfResults': CANDIDATE_RETRIEVAL_RESULTS}
+        }
+    return {
+        'input': {'text': combined_input},
+        'retrieveAndGenerateConfiguration': {
+            'knowledgeBaseConfiguration': knowledgeBaseConfiguration,
             'type': 'KNOWLEDGE_BASE'
         }
+    }
+
+# Function to get an answer from Bedrock using the knowledge base with a system prompt, streamed:
+# yields text as it is generated and fills `response` with the full output and citations
+# (the shape retrieve_and_generate returns) once the stream ends
+def streamAnswers(questions, system_prompt, candidates=None, response=None):
+    response = response if response is not None else {}
+    cache = get_default_response_cache()
+    cache_key = response_key(questions, system_prompt, knowledgeBaseId, modelArn, candidates)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        response.update(cached)
+        yield cached.get('output', {}).get('text', '')
+        return
+
+    stream = bedrockClient.retrieve_and_generate_stream(
+        **knowledgeBaseRequest(questions, system_prompt, candidates)
     )
-    return knowledgeBaseResponse
+    parts, citations = [], []
+    for event in stream['stream']:
+        if 'output' in event:
+            parts.append(event['output'].get('text', ''))
+            yield parts[-1]
+        elif 'citation' in event:
+            citations.append(event['citation'].get('citation', event['citation']))
+    response.update({'output': {'text': ''.join(parts)}, 'citations': citations})
+    cache.put(cache_key, response)
+
+# Function to render a streamed answer token by token in an assistant chat message
+def write_stream(questions, system_prompt, candidates=None):
+    response = {}
+    with st.chat_message("assistant"):
+        placeholder = st.empty()
+        output = ''
+        for text in streamAnswers(questions, system_prompt, candidates, response):
+            output += text
+            placeholder.markdown(output + "▌")
+        placeholder.markdown(output or 'No response text available.')
+    return response
 
 # Streamlit logic to display the citation text and source document
 def display_response(response):
-    if 'citations' in response and 'generatedResponsePart' in response['citations'][0]:
+    if response.get('citations') and 'generatedResponsePart' in response['citations'][0]:
         citation_text = response['citations'][0]['generatedResponsePart']['textResponsePart'].get('text', 'No text available')
         
         st.markdown(f"<span style='color:#FFDA33'>Citation Text: </span>{citation_text}", unsafe_allow_html=True)
@@ -105,16 +158,55 @@ Conclusion: Using this data, you will build well-balanced, communicative, and hi
 
 user_input = st.text_input("Ask a question:")
 if user_input:
-    # Get the response from Bedrock with the system prompt
-    response = getAnswers(user_input, system_prompt)
+    # Narrow the player pool by the question's hard constraints (region, language, role, ...) first
+    filters, matching, candidates = get_default_filter_index().context(user_input)
+    described = ', '.join(f"{key}: {'/'.join(values)}" for key, values in filters.items())
+    if candidates:
+        st.caption(f"{matching} players match {described}")
+    elif filters:
+        st.caption(f"No players match {described}; answering from the knowledge base alone")
 
     st.session_state.chat_history.append({"role": "user", "text": user_input})
 
+    # Stream the response from Bedrock with the system prompt as it is generated
+    response = write_stream(user_input, system_prompt, candidates)
+
     output = response.get('output', {}).get('text', 'No response text available.')
     st.session_state.chat_history.append({"role": "assistant", "text": output})
 
-    with st.chat_message("assistant"):
-        st.markdown(output)
-
-    # Display citation text, context, and source document if available
+    # Display citation text, context, and source document once the stream has ended
     display_response(response)
+
+# Team building runs locally; the model is only asked to explain the roster it gets
+with st.sidebar.form("team_builder"):
+    st.markdown("**Build a team**")
+    team_language = st.text_input("Shared language (optional)", placeholder="english")
+    team_region = st.text_input("Region (optional)", placeholder="na")
+    team_league = st.selectbox("League", ["any", "valorant champions international", "valorant challengers",
+                                          "valorant game changers"])
+    team_mixed = st.checkbox("Mixed-gender roster")
+    team_include = st.text_input("Must include (comma-separated handles)")
+    build_team = st.form_submit_button("Build")
+
+if build_team:
+    try:
+        rosters = get_default_optimiser().best_rosters(
+            top=3, language=team_language.strip() or None, region=team_region.strip() or None,
+            league=None if team_league == "any" else team_league,
+            require_genders=['Male', 'Female'] if team_mixed else [],
+            include=[handle.strip() for handle in team_include.split(',') if handle.strip()],
+        )
+        problem = None if rosters else "No roster satisfies these constraints"
+    except ValueError as e:  # e.g. more than 5 included players, or more than one IGL among them
+        rosters, problem = [], str(e)
+    if problem:
+        st.markdown(f"<span style='color:red'>{problem}</span>", unsafe_allow_html=True)
+    else:
+        for roster in rosters:
+            st.markdown(f"**{', '.join(roster.handles)}** (score {roster.score}, {roster.language}, "
+                        f"{roster.region}, leader {roster.leader})")
+        question = ("Explain the strengths, agent roles and leadership of this roster, built from the "
+                    "player data. Do not change the players.\n" + describe_roster(rosters[0]))
+        response = write_stream(question, system_prompt)
+        explanation = response.get('output', {}).get('text', 'No response text available.')
+        st.session_state.chat_history.append({"role": "assistant", "text": explanation})
@@ -1,25 +1,96 @@
+import argparse
+import re
+import numpy as np
 import pandas as pd
 import unidecode
 
-# Load the CSV file ensuring proper UTF-8 encoding
-input_csv = "D:\\vct-hackathon\\test-data\\final.csv"  # Replace with your CSV file path
-output_csv = "final_cleaned.csv"
+# Text columns cleaned in one pass
+TEXT_COLUMNS = ['handle', 'first_name', 'last_name', 'org', 'country', 'primary_language']
+# Columns whose ALL-CAPS values are title-cased, only with title_case_labels=True
+TITLE_CASE_COLUMNS = {'country', 'primary_language'}
+KEY_COLUMN = 'handle_key'
 
-# Read the CSV with UTF-8 encoding, handling encoding errors
-data = pd.read_csv(input_csv, encoding='latin-1')
+_WHITESPACE_RE = re.compile(r'\s+')
+_NON_KEY_RE = re.compile(r'[^0-9a-z]+')
 
 # Function to clean names: removes non-ASCII characters and ensures proper formatting
 def clean_name(name):
     if pd.isna(name):  # Check for NaN values
         return ""
     name = unidecode.unidecode(name)  # Convert to closest ASCII representation
-    return name.strip()  # Remove extra spaces
+    return _WHITESPACE_RE.sub(' ', name).strip()  # Remove extra spaces
 
-# Apply the cleaning function to name-related columns
-data['first_name'] = data['first_name'].apply(clean_name)
-data['last_name'] = data['last_name'].apply(clean_name)
+# Function to clean country / language values, turning "UNITED KINGDOM" into "United Kingdom"
+def clean_label(value):
+    value = clean_name(value)
+    return value.title() if value.isupper() and len(value) > 3 else value
 
-# Save the cleaned data back to a CSV file, ensuring UTF-8 encoding
-data.to_csv(output_csv, index=False, encoding='utf-8')
+# Function to build the join key for a handle: ASCII, case-folded, letters and digits only
+def normalise_key(handle):
+    cleaned = clean_name(handle).casefold()
+    return _NON_KEY_RE.sub('', cleaned) or cleaned
 
-print(f"Cleaned CSV data saved to {output_csv}")
+class TextNormaliser:
+    """Normalise the text columns of player frames, running unidecode once per distinct value.
+
+    The memo is kept across calls, so streaming a file chunk by chunk (or cleaning several leagues
+    with one normaliser) only pays for names it hasn't seen yet. Values keep their case unless
+    title_case_labels is set, which turns "UNITED KINGDOM" into "United Kingdom" in TITLE_CASE_COLUMNS.
+    """
+
+    def __init__(self, columns=None, key_column=KEY_COLUMN, title_case_labels=False):
+        self.columns = TEXT_COLUMNS if columns is None else columns
+        self.key_column = key_column
+        self.title_case_labels = title_case_labels
+        self._memo = {clean_name: {}, clean_label: {}, normalise_key: {}}
+
+    def normalise_series(self, series: pd.Series, function=clean_name) -> pd.Series:
+        # Clean the distinct values only, then broadcast them back with the factorize codes
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        memo = self._memo.setdefault(function, {})
+        cleaned = []
+        for value in uniques:
+            if value not in memo:
+                memo[value] = function(value)
+            cleaned.append(memo[value])
+        cleaned.append("")  # code -1 (missing) picks the last entry
+        return pd.Series(np.array(cleaned, dtype=object)[codes], index=series.index, dtype=object)
+
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        data = data.copy()
+        for column in self.columns:
+            if column in data.columns:
+                function = clean_label if self.title_case_labels and column in TITLE_CASE_COLUMNS else clean_name
+                data[column] = self.normalise_series(data[column], function)
+        if self.key_column and 'handle' in data.columns:
+            data[self.key_column] = self.normalise_series(data['handle'], normalise_key)
+        return data
+
+    def distinct_values(self) -> int:
+        return sum(len(memo) for memo in self._memo.values())
+
+def clean_csv(input_csv, output_csv, chunk_size=50_000, normaliser=None):
+    """Stream `input_csv` through the normaliser in chunks and write the cleaned rows as UTF-8."""
+    normaliser = normaliser or TextNormaliser()
+    rows = 0
+    # Read everything as text so numeric columns are written back exactly as they came in
+    chunks = pd.read_csv(input_csv, encoding='latin-1', dtype=str, keep_default_na=False, chunksize=chunk_size)
+    for index, chunk in enumerate(chunks):
+        cleaned = normaliser.transform(chunk)
+        cleaned.to_csv(output_csv, mode='w' if index == 0 else 'a', header=index == 0, index=False, encoding='utf-8')
+        rows += len(cleaned)
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalise the text columns of a player CSV")
+    parser.add_argument('input_csv', nargs='?', default="test-data/final.csv")
+    parser.add_argument('output_csv', nargs='?', default="final_cleaned.csv")
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--title-case-labels', action='store_true',
+                        help="also turn ALL-CAPS country / language values into Title Case")
+    args = parser.parse_args()
+
+    normaliser = TextNormaliser(title_case_labels=args.title_case_labels)
+    rows = clean_csv(args.input_csv, args.output_csv, args.chunk_size, normaliser)
+    print(f"Cleaned CSV data saved to {args.output_csv} "
+          f"({rows} rows, {normaliser.distinct_values()} distinct values normalised)")
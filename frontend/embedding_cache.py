@@ -0,0 +1,68 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+
+DEFAULT_PATH = '.embedding_cache/embeddings.sqlite3'
+
+# Function to address a chunk by its content, so the same row text is only ever embedded once per model
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class EmbeddingCache:
+    """Embeddings keyed by (model_id, sha256 of the chunk text), stored in a local SQLite file.
+
+    Vectors are kept as float64 bytes, so a cache hit returns exactly what Bedrock returned.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Streamlit reruns the script on other threads, so the connection is shared behind a lock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model_id TEXT NOT NULL, digest TEXT NOT NULL, vector BLOB NOT NULL, "
+            "PRIMARY KEY (model_id, digest))"
+        )
+        self._connection.commit()
+
+    def get_many(self, model_id: str, digests: Iterable[str]) -> Dict[str, List[float]]:
+        """The cached vectors among `digests`, by digest."""
+        digests = list(dict.fromkeys(digests))
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(digests), 500):
+                batch = digests[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT digest, vector FROM embeddings WHERE model_id = ? AND digest IN ({','.join('?' * len(batch))})",
+                    [model_id, *batch]
+                ).fetchall()
+                for digest, vector in rows:
+                    found[digest] = np.frombuffer(vector, dtype=np.float64).tolist()
+        return found
+
+    def put_many(self, model_id: str, items: Iterable[Tuple[str, List[float]]]):
+        rows = [(model_id, digest, np.asarray(vector, dtype=np.float64).tobytes()) for digest, vector in items]
+        if not rows:
+            return
+        with self._lock:
+            self._connection.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            self._connection.commit()
+
+    def count(self, model_id: str = None) -> int:
+        with self._lock:
+            if model_id is None:
+                return self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model_id = ?", [model_id]
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,42 @@
+import os
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401  (C-backed parser, much faster than html.parser)
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+# Pick the backend with VCT_HTML_PARSER=lxml|html.parser|html5lib, or call set_parser_backend()
+PARSER_BACKEND = os.environ.get('VCT_HTML_PARSER', DEFAULT_PARSER)
+# Set VCT_HTML_SCOPED=0 to parse whole pages again (e.g. to compare against scoped parsing)
+SCOPED_PARSING = os.environ.get('VCT_HTML_SCOPED', '1') != '0'
+
+
+# Function to match any of the given CSS classes; SoupStrainer sees the raw class="a b" string
+# while parsing, so a plain list would miss elements that carry more than one class
+def class_pattern(*names: str):
+    return re.compile(r'(?:^|\s)(?:' + '|'.join(map(re.escape, names)) + r')(?:\s|$)')
+
+
+# Everything the vlr.gg profile extractors read: the agent table, its rating / KAST cells,
+# the country line and the real name
+VLR_PROFILE_STRAINER = SoupStrainer(
+    class_=class_pattern('wf-table', 'mod-center', 'mod-right', 'ge-text-light', 'player-real-name'))
+
+# The win / loss rows of a Liquipedia Matches page
+LIQUIPEDIA_MATCHES_STRAINER = SoupStrainer('tr', class_=class_pattern('recent-matches-bg-win', 'recent-matches-bg-lose'))
+
+
+def set_parser_backend(parser: str):
+    """Switch the parser used by make_soup for the rest of the process."""
+    global PARSER_BACKEND
+    PARSER_BACKEND = parser
+
+
+def make_soup(markup, parse_only: SoupStrainer = None, parser: str = None) -> BeautifulSoup:
+    """Parse HTML with the configured backend, keeping only the parts matched by `parse_only`."""
+    if not SCOPED_PARSING:
+        parse_only = None
+    return BeautifulSoup(markup, parser or PARSER_BACKEND, parse_only=parse_only)
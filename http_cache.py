@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+import requests
+
+
+class FetchResult(NamedTuple):
+    url: str
+    status: int
+    body: bytes
+    headers: Dict[str, str]
+
+
+class HttpCache:
+    """Disk cache for page bodies that revalidates with ETag / Last-Modified."""
+
+    def __init__(self, cache_dir: str = '.http_cache', max_age: float = 6 * 3600,
+                 max_bytes: int = 500 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_age = max_age  # Entries younger than this are served without touching the network
+        self.max_bytes = max_bytes  # Least recently used entries are dropped above this size
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Load every entry's metadata once so eviction doesn't have to rescan the directory
+        self.entries: Dict[str, dict] = {}
+        for name in os.listdir(cache_dir):
+            if name.endswith('.json'):
+                try:
+                    with open(os.path.join(cache_dir, name), 'r', encoding='utf-8') as file:
+                        meta = json.load(file)
+                    self.entries[meta['url']] = meta
+                except (OSError, ValueError, KeyError):
+                    continue  # Skip half-written metadata
+        self.total_bytes = sum(meta['size'] for meta in self.entries.values())
+
+    def _path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def _write_meta(self, meta: dict):
+        tmp_path = self._path(meta['url'], f'.json.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(meta, file)
+        os.replace(tmp_path, self._path(meta['url'], '.json'))
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Return the cached metadata for a URL, or None."""
+        return self.entries.get(url)
+
+    def is_fresh(self, meta: dict) -> bool:
+        return time.time() - meta['fetched_at'] < self.max_age
+
+    def read_body(self, url: str) -> Optional[bytes]:
+        try:
+            with open(self._path(url, '.body'), 'rb') as file:
+                body = file.read()
+        except OSError:
+            return None
+        with self._lock:
+            if url in self.entries:
+                self.entries[url]['last_used'] = time.time()
+        return body
+
+    def conditional_headers(self, meta: Optional[dict]) -> Dict[str, str]:
+        """Headers that let the server answer 304 Not Modified for a cached page."""
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def store(self, url: str, body: bytes, headers: Dict[str, str]):
+        """Save a 200 response and evict old entries if the cache is over its size limit."""
+        # Per-thread temp names: the async fetcher and the scrapers store from several threads
+        tmp_path = self._path(url, f'.body.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'wb') as file:
+            file.write(body)
+        os.replace(tmp_path, self._path(url, '.body'))
+
+        now = time.time()
+        headers = {name.lower(): value for name, value in headers.items()}
+        meta = {
+            'url': url,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'fetched_at': now,
+            'last_used': now,
+            'size': len(body),
+        }
+        self._write_meta(meta)
+        with self._lock:
+            old = self.entries.get(url)
+            self.total_bytes += meta['size'] - (old['size'] if old else 0)
+            self.entries[url] = meta
+        self.evict()
+
+    def refresh(self, url: str):
+        """Mark a cached page as fresh again after the server answered 304."""
+        with self._lock:
+            meta = self.entries.get(url)
+            if meta is None:
+                return
+            meta['fetched_at'] = meta['last_used'] = time.time()
+        self._write_meta(meta)
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            if self.total_bytes <= self.max_bytes:
+                return
+            victims = []
+            for meta in sorted(self.entries.values(), key=lambda m: m['last_used']):
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self.total_bytes -= meta['size']
+                victims.append(meta['url'])
+            for url in victims:
+                del self.entries[url]
+        for url in victims:
+            for suffix in ('.json', '.body'):
+                try:
+                    os.remove(self._path(url, suffix))
+                except OSError:
+                    pass
+
+    def get(self, url: str, session: requests.Session = None, **kwargs) -> FetchResult:
+        """Blocking GET through the cache (fresh hit -> disk, stale hit -> conditional GET)."""
+        meta = self.lookup(url)
+        if meta and self.is_fresh(meta):
+            body = self.read_body(url)
+            if body is not None:
+                return FetchResult(url, 200, body, {})
+
+        session = session or requests
+        base_headers = kwargs.pop('headers', {})
+        response = session.get(url, headers={**base_headers, **self.conditional_headers(meta)}, **kwargs)
+
+        if response.status_code == 304 and meta:
+            body = self.read_body(url)
+            if body is not None:
+                self.refresh(url)
+                return FetchResult(url, 200, body, dict(response.headers))
+            # Body went missing from disk, fetch it again without conditions
+            response = session.get(url, headers=base_headers, **kwargs)
+
+        if response.status_code == 200:
+            self.store(url, response.content, response.headers)
+        return FetchResult(url, response.status_code, response.content, dict(response.headers))
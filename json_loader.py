@@ -0,0 +1,120 @@
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Tuple
+
+try:
+    import orjson  # Much faster decoder, used when installed
+except ImportError:
+    orjson = None
+
+# Files at least this big are memory-mapped instead of read into a bytes copy (orjson only: it parses
+# the mapping in place, while the stdlib decoder would need a copy of it anyway)
+MMAP_THRESHOLD = 16 * 1024 * 1024
+# Next to this module rather than the working directory, so every script shares one cache
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.json_cache')
+
+_memory_cache: Dict[Tuple[str, str], tuple] = {}  # (path, errors) -> (signature, data)
+_memory_lock = threading.Lock()
+
+
+# Function to identify a file version; any edit changes the mtime or the size
+def _file_signature(path: str) -> tuple:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _decode(data, errors: str):
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            if errors == 'strict':
+                raise
+            # orjson rejects invalid UTF-8, retry on the replaced text below
+    text = str(data, 'utf-8', errors)  # Decodes a memoryview without copying it to bytes first
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+# Function to decode a JSON file, memory-mapping it when it is large and orjson can read the mapping
+def decode_json_file(path: str, errors: str = 'strict') -> Any:
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if orjson is None or size < MMAP_THRESHOLD:
+            return _decode(file.read(), errors)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return _decode(view, errors)
+            finally:
+                view.release()
+
+
+# Function to name a file's pickle; `errors` is part of it since it changes what the file decodes to
+def _cache_path(cache_dir: str, path: str, errors: str) -> str:
+    return os.path.join(cache_dir, hashlib.sha1(f"{path}\0{errors}".encode('utf-8')).hexdigest() + '.pickle')
+
+
+def load_json(file_path: str, errors: str = 'strict', cache_dir: str = DEFAULT_CACHE_DIR) -> Any:
+    """Load a JSON file, reusing the decoded object while the file's mtime and size are unchanged.
+
+    Objects are cached per `errors` mode, so a lenient load never answers a strict one.
+
+    Decoded objects are kept in memory for this process and pickled under `cache_dir`, so restarts
+    skip decoding too (pass cache_dir=None to disable the disk cache). Cached objects are shared
+    between callers, so treat them as read-only.
+    """
+    path = os.path.abspath(file_path)
+    signature = _file_signature(path)
+    with _memory_lock:
+        cached = _memory_cache.get((path, errors))
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    data = None
+    found = False
+    pickle_path = _cache_path(cache_dir, path, errors) if cache_dir else None
+    if pickle_path and os.path.exists(pickle_path):
+        try:
+            with open(pickle_path, 'rb') as file:
+                cached_signature, cached_data = pickle.load(file)
+            if cached_signature == signature:
+                data, found = cached_data, True
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            pass  # Unreadable cache entry, decode the file again
+
+    if not found:
+        data = decode_json_file(path, errors)
+        if pickle_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{pickle_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                pickle.dump((signature, data), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, pickle_path)
+
+    with _memory_lock:
+        _memory_cache[(path, errors)] = (signature, data)
+    return data
+
+
+def load_json_files(file_paths: Dict[str, str], errors: str = 'strict', cache_dir: str = DEFAULT_CACHE_DIR,
+                    max_workers: int = None) -> Dict[str, Any]:
+    """Load several JSON files concurrently; returns {key: decoded data} in the order of `file_paths`."""
+    with ThreadPoolExecutor(max_workers=max_workers or len(file_paths) or 1) as executor:
+        futures = {key: executor.submit(load_json, path, errors, cache_dir) for key, path in file_paths.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+
+# Function to drop cached objects (e.g. in long-lived processes that load many different files)
+def clear_memory_cache(paths: Iterable[str] = None):
+    with _memory_lock:
+        if paths is None:
+            _memory_cache.clear()
+        else:
+            paths = {os.path.abspath(path) for path in paths}
+            for key in [key for key in _memory_cache if key[0] in paths]:
+                del _memory_cache[key]
@@ -1,11 +1,10 @@
 import csv
-import time
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from driver_pool import DriverPool, get_default_pool
+from profile_resolver import ProfileResolver, get_default_resolver, open_vlr_profile
+from scrape_journal import run_scrape_job
 
 # Function to log errors to a CSV file
 def log_error(player_name: str, error_message: str, error_log_csv: str):
@@ -14,89 +13,67 @@ def log_error(player_name: str, error_message: str, error_log_csv: str):
         writer = csv.writer(error_file)
         writer.writerow([player_name, error_message])  # Write player name and error message
 
-# Function to perform Google search, open first link, and scrape country
-def search_and_scrape_country(player_name: str) -> str:
+# Function to open the player's vlr.gg profile and scrape country
+def search_and_scrape_country(player_name: str, pool: DriverPool = None, resolver: ProfileResolver = None) -> str:
     """Search for the player and scrape their country."""
-    driver = webdriver.Chrome()
-    
-    try:
-        # Step 1: Perform Google search with site:vlr.gg
-        driver.get("https://www.google.com")
-        search_box = driver.find_element(By.NAME, 'q')
-        search_query = f"{player_name} site:vlr.gg"
-        search_box.send_keys(search_query)
-        search_box.send_keys(Keys.RETURN)
+    pool = pool or get_default_pool()
+    resolver = resolver or get_default_resolver()
 
-        # Step 2: Open first search result
-        time.sleep(2)  # Wait for results to load
-        first_result = driver.find_elements(By.CSS_SELECTOR, 'h3')[0]
-        first_result.click()
+    try:
+        # Borrow a warm browser from the pool instead of starting Chrome per player
+        with pool.driver() as driver:
+            # Step 1: Open the player's vlr.gg profile directly (Google is only used for unknown handles)
+            open_vlr_profile(driver, player_name, resolver, query_suffix='site:vlr.gg')
 
-        # Step 3: Wait for the page to load
-        time.sleep(3)
+            # Step 2: Locate the country element using WebDriverWait
+            country_element = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div.ge-text-light"))
+            )
 
-        # Step 4: Locate the country element using WebDriverWait
-        country_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.ge-text-light"))
-        )
-        
-        # Step 5: Extract the country information
-        if country_element:
-            country_text = country_element.text.strip()
-            return country_text.split()[-1]  # Extract the country name (last word)
-        return None
+            # Step 3: Extract the country information
+            if country_element:
+                country_text = country_element.text.strip()
+                return country_text.split()[-1]  # Extract the country name (last word)
+            return None
 
     except Exception as e:
         error_message = str(e)
         print(f"An error occurred while scraping {player_name}: {error_message}")
         log_error(player_name, error_message, error_log_csv)
         return None  # Return None if error occurs
-    finally:
-        driver.quit()  # Ensure the browser is closed
 
 # Read the input CSV, scrape data, and update the same CSV
-def update_country_in_csv(input_csv: str, error_log_csv: str):
-    """Update missing countries in the CSV by scraping data."""
-    rows = []
+def update_country_in_csv(input_csv: str, error_log_csv: str, pool: DriverPool = None, journal_path: str = None):
+    """Update missing countries in the CSV by scraping data.
+
+    Each scraped country is appended to a journal as it arrives and the CSV is rewritten once, atomically,
+    at the end, so the input is never left half-written and a rerun only scrapes what is still missing.
+    """
+    def needs_scrape(row):
+        return not row[1]  # Check if the country (second column) is missing or empty
+
+    def scrape(player_handle):
+        print(f"Fetching country data for {player_handle}...")
 
-    # Step 1: Read the CSV content
-    with open(input_csv, mode='r', newline='', encoding='utf-8') as infile:
-        reader = csv.reader(infile)
-        headers = next(reader)  # Read the headers
+        # Fetch country data
+        country = search_and_scrape_country(player_handle, pool)
+        if country:
+            print(f"Player: {player_handle}, Country: {country}")
+        else:
+            print(f"No country data found for {player_handle}")
+        return country or None  # Players without a country are retried on the next run
 
-        # Write back the headers to the CSV (if needed)
-        rows.append(headers)  # Append headers to rows
+    def apply(row, country):
+        row[1] = country  # Update the country column
 
-        # Loop through each row in the original CSV
-        for row in reader:
-            player_handle = row[0]  # Assuming player handle is the first column
-            player_country = row[1]  # Assuming country is the second column
-            
-            # Initialize country variable to None before attempting to scrape
-            country = None
-            
-            if not player_country:  # Check if the country is missing or empty
-                print(f"Fetching country data for {player_handle}...")
-                
-                # Fetch country data
-                country = search_and_scrape_country(player_handle)
-                
-                # Only update the country column if valid data is scraped
-                if country:
-                    row[1] = country  # Update the country column
-                    print(f"Player: {player_handle}, Country: {country}")
-                else:
-                    print(f"No country data found for {player_handle}")
-            
-            # Append the updated row to the rows list
-            rows.append(row)
-            
-            # Step 2: Write the updated row back to the CSV immediately after fetching
-            with open(input_csv, mode='w', newline='', encoding='utf-8') as outfile:
-                writer = csv.writer(outfile)
-                writer.writerows(rows)  # Write all rows back to the CSV
+    run_scrape_job(input_csv, input_csv, journal_path or f"{input_csv}.journal", scrape, apply,
+                   needs_scrape=needs_scrape, encoding='utf-8', sync_every=10)
 
 # Example usage
 input_csv_path = r'test-data\\missing_coun_lang.csv'
 error_log_csv = r'test-data\\missing_coun_lang_error_log.csv'  # Path for the error log
-update_country_in_csv(input_csv_path, error_log_csv)
\ No newline at end of file
+driver_pool = DriverPool(size=1, max_pages=50)  # Reuse one browser, restart it every 50 players
+try:
+    update_country_in_csv(input_csv_path, error_log_csv, driver_pool)
+finally:
+    driver_pool.close()
\ No newline at end of file
@@ -0,0 +1,32 @@
+from html_parse import LIQUIPEDIA_MATCHES_STRAINER, make_soup
+
+
+# Function to count agents in the Liquipedia matches table and return the top 3
+def parse_top_agents(content: bytes) -> str:
+    """Return the player's 3 most played agents from a Liquipedia Matches page."""
+    soup = make_soup(content, LIQUIPEDIA_MATCHES_STRAINER)
+
+    # Initialize an empty dictionary to store agent counts
+    agent_counts = {}
+
+    # Find all rows with win or lose classes
+    rows = soup.find_all('tr', class_=['recent-matches-bg-win', 'recent-matches-bg-lose'])
+
+    # Loop through each row
+    for row in rows:
+        columns = row.find_all('td')
+        if len(columns) >= 7:
+            agent_column = columns[6]  # The agent column is at index 6
+            agent_images = agent_column.find_all('img')
+
+            for agent_image in agent_images:
+                if agent_image and 'alt' in agent_image.attrs:
+                    agent_name = agent_image['alt']
+                    if agent_name in agent_counts:
+                        agent_counts[agent_name] += 1
+                    else:
+                        agent_counts[agent_name] = 1
+
+    # Sort agents by number of times played and return as a string
+    sorted_agents = sorted(agent_counts.items(), key=lambda item: item[1], reverse=True)
+    return ', '.join([agent for agent, _ in sorted_agents[:3]])  # Get top 3 agents
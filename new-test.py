@@ -1,4 +1,5 @@
 import json
+import json_loader
 from typing import List, Dict, Any
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
@@ -17,15 +18,18 @@ from dotenv import load_dotenv
 load_dotenv()
 
 def load_json_file(file_path: str) -> List[Dict]:
-    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-        try:
-            return json.load(file)
-        except json.JSONDecodeError as e:
-            print(f"Error decoding JSON from {file_path}: {e}")
-            return []
+    try:
+        return json_loader.load_json(file_path, errors='replace')
+    except json.JSONDecodeError as e:
+        print(f"Error decoding JSON from {file_path}: {e}")
+        return []
 
 def load_json_files(file_paths: Dict[str, str]) -> Dict[str, List[Dict]]:
-    return {key: load_json_file(path) for key, path in file_paths.items()}
+    # Load the files concurrently, then fall back to one at a time to report any file that fails
+    try:
+        return json_loader.load_json_files(file_paths, errors='replace')
+    except json.JSONDecodeError:
+        return {key: load_json_file(path) for key, path in file_paths.items()}
 
 def create_vector_store(documents: List[Document]):
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
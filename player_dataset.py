@@ -0,0 +1,248 @@
+"""Compile the player CSVs into one typed Parquet file.
+
+The CSVs keep every metric as text ("71%", "sova, skye, fade", "eu|na", "TRUE"), so every reader had
+to re-parse them with encoding='latin-1'. `build_dataset` does that once: percentages become floats
+(71% -> 71.0), agents / regions become list columns, igl a nullable boolean and the low-cardinality
+text columns categoricals. `load_players` reads the result back, rebuilding it if a source changed.
+
+    python player_dataset.py                                  # final-data/final_cleaned.csv
+    python player_dataset.py --source ch_final.csv="valorant challengers" --source ...
+"""
+import argparse
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from frontend.clean import normalise_key
+from vlr_extract import PERCENT_COLUMNS, PLAYER_COLUMNS
+
+DEFAULT_SOURCES = {'final-data/final_cleaned.csv': None}  # already has a league column
+DEFAULT_OUTPUT = 'final-data/players.parquet'
+# Parquet metadata key holding the sources a dataset was built from, with their signatures
+SOURCES_METADATA_KEY = b'player_dataset.sources'
+# Version of the compile step itself; bump it when compile_players changes so old files are rebuilt
+FORMAT_METADATA_KEY = b'player_dataset.format'
+DATASET_FORMAT = 3
+
+# Leagues of the per-league files, for sources without a league column
+LEAGUE_FILES = {
+    'ch_final.csv': 'valorant challengers',
+    'gc_final.csv': 'valorant game changers',
+    'vct_final.csv': 'valorant champions international',
+}
+
+FLOAT_COLUMNS = [
+    'rating', 'average_combat_score', 'kill_deaths', 'average_damage_per_round', 'kills_per_round',
+    'assists_per_round', 'first_kills_per_round', 'first_deaths_per_round',
+]
+# List columns and the separator they use in the CSVs
+LIST_COLUMNS = {'agents': ',', 'regions': '|'}
+CATEGORY_COLUMNS = ['status', 'org', 'gender', 'country', 'primary_language', 'league']
+# Agent roles, as listed in the team-builder system prompt (agent names as they appear in `agents`)
+AGENT_ROLES = {
+    'duelist': ['phoenix', 'jett', 'reyna', 'raze', 'yoru', 'iso', 'neon'],
+    'controller': ['brimstone', 'omen', 'viper', 'astra', 'harbor', 'clove'],
+    'initiator': ['sova', 'skye', 'breach', 'kayo', 'kay/o', 'gekko', 'fade'],
+    'sentinel': ['sage', 'cypher', 'killjoy', 'chamber', 'deadlock', 'vyse'],
+}
+ROLE_OF_AGENT = {agent: role for role, agents in AGENT_ROLES.items() for agent in agents}
+# Arrow-backed lists take a fraction of the memory of Python lists in an object column
+LIST_DTYPE = pd.ArrowDtype(pa.list_(pa.string()))
+
+
+# Function to split "Sova, Skye, Breach" / "eu|na" into a clean lower-case list
+def split_list(value, separator: str) -> List[str]:
+    if not isinstance(value, str):
+        return []
+    return [item.strip().lower() for item in value.split(separator) if item.strip()]
+
+
+def coerce_player_frame(data: pd.DataFrame, league: Optional[str] = None) -> pd.DataFrame:
+    """Turn a raw all-text player frame into typed columns. Cells that don't parse (e.g. rows whose
+    columns are shifted) become missing values instead of failing the whole build."""
+    data = data.copy()
+    data.columns = [column.strip() for column in data.columns]
+    data = data.loc[:, [column for column in data.columns if column and not column.startswith('Unnamed')]]
+    if league is not None and 'league' not in data.columns:
+        data['league'] = league
+    for column in PLAYER_COLUMNS + ['league']:
+        if column not in data.columns:
+            data[column] = pd.NA
+
+    text = data.astype('string').apply(lambda column: column.str.strip())
+    for column in FLOAT_COLUMNS + PERCENT_COLUMNS:
+        numbers = pd.to_numeric(text[column].str.rstrip('%').str.replace(',', ''), errors='coerce')
+        if column in PERCENT_COLUMNS:
+            # Some sources hold the fraction ("0.71") instead of the percent ("71%")
+            fraction = ~text[column].str.endswith('%').fillna(False).astype(bool) & (numbers <= 1)
+            numbers = numbers.where(~fraction, numbers * 100)
+        data[column] = numbers.astype('float64')
+    data['rounds_played'] = pd.to_numeric(text['rounds_played'], errors='coerce').round().astype('Int64')
+    data['igl'] = text['igl'].str.upper().map({'TRUE': True, 'FALSE': False}).astype('boolean')
+    for column, separator in LIST_COLUMNS.items():
+        data[column] = pd.Series([split_list(value, separator) for value in text[column].tolist()],
+                                 index=data.index, dtype=LIST_DTYPE)
+    for column in CATEGORY_COLUMNS:
+        data[column] = text[column].replace('', pd.NA).astype('category')
+    for column in ['handle', 'first_name', 'last_name', 'photo_url']:
+        data[column] = text[column].replace('', pd.NA)
+    return data[PLAYER_COLUMNS + ['league']]
+
+
+def read_player_csv(path: str, league: Optional[str] = None) -> pd.DataFrame:
+    """Read one player CSV (latin-1, as written by the scrapers) into typed columns."""
+    raw = pd.read_csv(path, encoding='latin-1', dtype=str, keep_default_na=False)
+    return coerce_player_frame(raw, league if league is not None else LEAGUE_FILES.get(os.path.basename(path)))
+
+
+def dedupe_players(players: pd.DataFrame) -> pd.DataFrame:
+    """One row per (league, handle key): the last one, since later rows and sources are newer scrapes.
+
+    "ardiis" and "Ardiis" in one league are one player; the same handle in two leagues stays twice.
+    """
+    keys = players['handle'].fillna('').map(normalise_key)
+    duplicated = pd.DataFrame({'league': players['league'].astype(str), 'key': keys}).duplicated(keep='last')
+    return players[~duplicated.to_numpy()].reset_index(drop=True)
+
+
+def compile_players(sources: Dict[str, Optional[str]] = None) -> pd.DataFrame:
+    """Read every source CSV and concatenate them; `sources` maps path -> league (None to use the file's).
+
+    Duplicated players are dropped here (see dedupe_players), so every reader sees the same rows.
+    """
+    frames = [read_player_csv(path, league) for path, league in (sources or DEFAULT_SOURCES).items()]
+    data = dedupe_players(pd.concat(frames, ignore_index=True))
+    # Concatenating categoricals with different categories falls back to strings
+    for column in CATEGORY_COLUMNS:
+        data[column] = data[column].astype('category')
+    return data
+
+
+# Function to fingerprint a source: size and mtime for the quick check, content hash for after a checkout
+def source_signature(path: str) -> dict:
+    stat = os.stat(path)
+    with open(path, 'rb') as file:
+        digest = hashlib.sha256(file.read()).hexdigest()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+
+
+def build_dataset(sources: Dict[str, Optional[str]] = None, output_path: str = DEFAULT_OUTPUT) -> pd.DataFrame:
+    """Compile the sources and write them as Parquet (atomically); returns the compiled frame.
+
+    The source list and each source's signature are stored in the file's metadata, so
+    `load_players` knows what the dataset was built from and when it is out of date.
+    """
+    sources = sources or DEFAULT_SOURCES
+    data = compile_players(sources)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    # Lists are written from plain object columns: pyarrow can't read an ArrowDtype list back out of
+    # the pandas metadata, load_players restores the Arrow dtype instead
+    plain = data.astype({column: object for column in LIST_COLUMNS})
+    table = pa.Table.from_pandas(plain, preserve_index=False)
+    built_from = {path: {'league': league, **source_signature(path)} for path, league in sources.items()}
+    metadata = {**(table.schema.metadata or {}), SOURCES_METADATA_KEY: json.dumps(built_from).encode('utf-8'),
+                FORMAT_METADATA_KEY: str(DATASET_FORMAT).encode('utf-8')}
+    pq.write_table(table.replace_schema_metadata(metadata), tmp_path, compression='zstd')
+    os.replace(tmp_path, output_path)
+    return data
+
+
+def _dataset_metadata(output_path: str) -> Optional[Dict[bytes, bytes]]:
+    try:
+        return pq.read_schema(output_path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def built_sources(output_path: str = DEFAULT_OUTPUT) -> Optional[Dict[str, dict]]:
+    """{path: {league, size, mtime_ns, sha256}} the dataset was built from, or None if unknown."""
+    metadata = _dataset_metadata(output_path)
+    if not metadata or SOURCES_METADATA_KEY not in metadata:
+        return None
+    return json.loads(metadata[SOURCES_METADATA_KEY])
+
+
+def is_stale(output_path: str = DEFAULT_OUTPUT, sources: Dict[str, Optional[str]] = None) -> bool:
+    """True when the dataset is missing, was built from other sources or by an older compile step,
+    or a source's content changed.
+
+    Without `sources` the dataset is checked against the sources it was built from.
+    """
+    built = built_sources(output_path)
+    if built is None:
+        return True
+    if _dataset_metadata(output_path).get(FORMAT_METADATA_KEY) != str(DATASET_FORMAT).encode('utf-8'):
+        return True
+    wanted = sources or {path: entry['league'] for path, entry in built.items()}
+    if wanted != {path: entry['league'] for path, entry in built.items()}:
+        return True
+    for path, entry in built.items():
+        if not os.path.exists(path):
+            continue  # Nothing to rebuild from; keep what was compiled
+        stat = os.stat(path)
+        if (stat.st_size, stat.st_mtime_ns) == (entry['size'], entry['mtime_ns']):
+            continue
+        # mtimes change on checkout without the content changing, so fall back to the hash
+        if stat.st_size != entry['size'] or source_signature(path)['sha256'] != entry['sha256']:
+            return True
+    return False
+
+
+def load_players(path: str = DEFAULT_OUTPUT, sources: Dict[str, Optional[str]] = None,
+                 columns: List[str] = None) -> pd.DataFrame:
+    """Load the compiled dataset, building it first if it is missing or out of date with its sources.
+
+    Without `sources` a dataset built with `--source` is refreshed from those same sources.
+    """
+    if is_stale(path, sources):
+        built = built_sources(path)
+        data = build_dataset(sources or ({p: e['league'] for p, e in built.items()} if built else None), path)
+        return data[columns] if columns else data
+    table = pq.read_table(path, columns=columns)
+    return table.to_pandas(types_mapper=lambda arrow_type: LIST_DTYPE if pa.types.is_list(arrow_type) else None)
+
+
+_signature_sources: Dict[Tuple[int, int], List[str]] = {}
+
+
+def dataset_signature(path: str = DEFAULT_OUTPUT) -> Tuple:
+    """Cheap (stat-only) fingerprint of the dataset and its sources, for callers that cache what
+    they derive from `load_players()` and only want to reload when something changed."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (path, None)
+    built_key = (stat.st_size, stat.st_mtime_ns)
+    if built_key not in _signature_sources:
+        _signature_sources.clear()
+        _signature_sources[built_key] = sorted(built_sources(path) or DEFAULT_SOURCES)
+    signature = [(path, *built_key)]
+    for source in _signature_sources[built_key]:
+        try:
+            source_stat = os.stat(source)
+            signature.append((source, source_stat.st_size, source_stat.st_mtime_ns))
+        except OSError:
+            signature.append((source, None))
+    return tuple(signature)
+
+
+# Function to parse "path" or "path=league" command line sources
+def parse_source(value: str):
+    path, _, league = value.partition('=')
+    return path, league or None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the player CSVs into a typed Parquet file")
+    parser.add_argument('--source', action='append', type=parse_source,
+                        help="CSV to include, optionally as path=league (default: final-data/final_cleaned.csv)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    players = build_dataset(dict(args.source) if args.source else None, args.output)
+    print(f"Wrote {len(players)} players to {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} KB, {players.memory_usage(deep=True).sum() / 1024:.0f} KB in memory)")
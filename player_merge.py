@@ -0,0 +1,270 @@
+"""Merge the overlapping per-league player CSVs into one canonical dataset.
+
+Every source is hash-joined on the normalised handle (frontend/clean.normalise_key). For each
+player and column the value is picked by the column's rule, after dropping empty and `N/A` values:
+'newest' (default) takes the most recently scraped source, 'oldest' the earliest. Sources are
+given oldest first; pass explicit scrape times to rank them otherwise (mtimes aren't used, a
+fresh checkout gives every file the same one). Percentages are read in one unit, so a source with
+the fraction "0.71" and one with "71%" agree on KAST.
+
+The merge is incremental. Parsed rows and the canonical result are kept in a state file, so
+adding or updating one source only re-resolves the handles whose rows in that source changed.
+Each run returns a diff report of added / changed / removed cells and of conflicts where
+sources disagreed.
+
+    python player_merge.py                          # merge DEFAULT_SOURCES
+    python player_merge.py --source test-data/ch_final_updated.csv --source ...
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from frontend.clean import normalise_key
+from scrape_journal import write_csv_atomic
+from vlr_extract import PERCENT_COLUMNS, PLAYER_COLUMNS, normalise_percent
+
+# Oldest to newest
+DEFAULT_SOURCES = [
+    'ch_final.csv',
+    'test-data/chmulti_cleaned.csv',
+    'test-data/ch_final_updated.csv',
+    'test-data/gcmulti_cleaned.csv',
+    'test-data/updated_gcmulti_cleaned_error.csv',
+    'test-data/one_final.csv',
+    'test-data/vct_final.csv',
+]
+DEFAULT_OUTPUT = 'final-data/merged_players.csv'
+DEFAULT_STATE = 'final-data/merge_state.json'
+
+# League of each file, by file name prefix
+LEAGUE_PREFIXES = {
+    'ch': 'valorant challengers',
+    'gc': 'valorant game changers',
+    'updated_gc': 'valorant game changers',
+    'one': 'valorant champions international',
+    'vct': 'valorant champions international',
+}
+
+MISSING_VALUES = {'', 'n/a', 'na', 'nan', 'none', 'null', '-'}
+# Tokens that look like N/A but are real values in a column ("na" is North America)
+REAL_VALUES = {'regions': {'na'}}
+RULES = ('newest', 'oldest')
+STATE_FORMAT = 2  # Bump when read_source changes how values are parsed, so saved states are rebuilt
+
+
+# Function to guess a source's league from its file name
+def league_for(path: str) -> Optional[str]:
+    name = os.path.basename(path).lower()
+    for prefix, league in sorted(LEAGUE_PREFIXES.items(), key=lambda item: -len(item[0])):
+        if name.startswith(prefix):
+            return league
+    return None
+
+
+def is_missing(value: Optional[str], column: str = None) -> bool:
+    if value is None:
+        return True
+    token = value.strip().lower()
+    return token in MISSING_VALUES and token not in REAL_VALUES.get(column, ())
+
+
+# Function to fingerprint a file version
+def file_signature(path: str) -> List[float]:
+    stat = os.stat(path)
+    return [stat.st_mtime, stat.st_size]
+
+
+def read_source(path: str, league: Optional[str] = None) -> Tuple[List[str], Dict[str, Dict[str, str]]]:
+    """Read one CSV into (columns, {handle_key: row}); a handle repeated in a file keeps its last row."""
+    with open(path, mode='r', newline='', encoding='latin-1') as infile:
+        reader = csv.reader(infile)
+        headers = [header.strip() for header in next(reader)]
+        rows = {}
+        for values in reader:
+            row = {header: value.strip() for header, value in zip(headers, values) if header}
+            for column in PERCENT_COLUMNS:
+                if column in row:
+                    row[column] = normalise_percent(row[column])  # "0.71" and "71%" are one value
+            key = normalise_key(row.get('handle', ''))
+            if not key:
+                continue
+            if league and is_missing(row.get('league')):
+                row['league'] = league
+            rows[key] = row
+    columns = [header for header in headers if header]
+    if league and 'league' not in columns:
+        columns.append('league')
+    return columns, rows
+
+
+# Function to hash a row so unchanged rows can be skipped on the next merge
+def row_digest(row: Dict[str, str]) -> str:
+    return hashlib.sha1(json.dumps(row, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class PlayerMerger:
+    """Incremental merge of player CSVs keyed on the normalised handle."""
+
+    def __init__(self, state_path: str = DEFAULT_STATE, rules: Dict[str, str] = None, default_rule: str = 'newest'):
+        for rule in [default_rule, *(rules or {}).values()]:
+            if rule not in RULES:
+                raise ValueError(f"Unknown merge rule: {rule}")
+        self.state_path = state_path
+        self.rules = rules or {}
+        self.default_rule = default_rule
+        self.sources: Dict[str, dict] = {}  # path -> {signature, rank, columns, rows, digests}
+        self.canonical: Dict[str, Dict[str, str]] = {}
+        self.provenance: Dict[str, Dict[str, str]] = {}  # key -> column -> source path
+        if state_path and os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+            if state.get('format') == STATE_FORMAT and state.get('rules') == [self.default_rule, self.rules]:
+                self.sources = state['sources']
+                self.canonical = state['canonical']
+                self.provenance = state['provenance']
+
+    def add_source(self, path: str, scraped_at: float = None, league: Optional[str] = None,
+                   order: int = 0) -> Set[str]:
+        """Load or refresh one source. Returns the handle keys whose rows changed in it."""
+        signature = file_signature(path)
+        scraped_at = scraped_at or 0
+        known = self.sources.get(path)
+        if known and known['signature'] == signature and known['rank'] == [scraped_at, order]:
+            return set()
+
+        columns, rows = read_source(path, league if league is not None else league_for(path))
+        digests = {key: row_digest(row) for key, row in rows.items()}
+        old_digests = known['digests'] if known else {}
+        affected = {key for key in set(digests) | set(old_digests) if digests.get(key) != old_digests.get(key)}
+        if known and known['rank'] != [scraped_at, order]:
+            affected |= set(digests)  # Its priority moved, so every key it touches may resolve differently
+        self.sources[path] = {
+            'signature': signature, 'rank': [scraped_at, order], 'columns': columns,
+            'rows': rows, 'digests': digests,
+        }
+        return affected
+
+    def remove_source(self, path: str) -> Set[str]:
+        source = self.sources.pop(path, None)
+        return set(source['rows']) if source else set()
+
+    def columns(self) -> List[str]:
+        extra = []
+        for source in self.sources.values():
+            extra.extend(column for column in source['columns'] if column not in PLAYER_COLUMNS + extra)
+        return PLAYER_COLUMNS + extra
+
+    def resolve(self, key: str) -> Tuple[Optional[Dict[str, str]], Dict[str, str], List[dict]]:
+        """Merge every source's row for one handle key into (row, provenance, conflicts)."""
+        candidates = [(source['rank'], path, source['rows'][key])
+                      for path, source in self.sources.items() if key in source['rows']]
+        if not candidates:
+            return None, {}, []
+        candidates.sort(key=lambda candidate: candidate[0])  # oldest first
+
+        row, provenance, conflicts = {}, {}, []
+        for column in self.columns():
+            present = [(path, values[column]) for _, path, values in candidates if column in values]
+            filled = [(path, value) for path, value in present if not is_missing(value, column)]
+            if not filled:
+                # Nothing usable: keep an explicit N/A over a blank if some source had one
+                row[column] = next((value for _, value in reversed(present) if value), '')
+                continue
+            rule = self.rules.get(column, self.default_rule)
+            path, value = filled[-1] if rule == 'newest' else filled[0]
+            row[column], provenance[column] = value, path
+            if len({candidate for _, candidate in filled}) > 1:
+                conflicts.append({'key': key, 'column': column, 'kind': 'conflict', 'new_value': value,
+                                  'source': path, 'old_value': ' | '.join(sorted({v for _, v in filled} - {value}))})
+        return row, provenance, conflicts
+
+    def merge(self, sources: Iterable, scraped_at: Dict[str, float] = None) -> List[dict]:
+        """Bring the canonical dataset up to date with `sources` (paths, or (path, league) pairs).
+
+        Only handles whose rows changed in some source are re-resolved. Returns the diff report.
+        """
+        scraped_at = scraped_at or {}
+        wanted = [(source, None) if isinstance(source, str) else tuple(source) for source in sources]
+        affected = set()
+        for path in set(self.sources) - {path for path, _ in wanted}:
+            affected |= self.remove_source(path)
+        for order, (path, league) in enumerate(wanted):
+            affected |= self.add_source(path, scraped_at.get(path), league, order)
+
+        report = []
+        for key in sorted(affected):
+            old_row = self.canonical.get(key)
+            row, provenance, conflicts = self.resolve(key)
+            handle = (row or old_row or {}).get('handle', key)
+            if row is None:
+                self.canonical.pop(key, None)
+                self.provenance.pop(key, None)
+                report.append({'key': key, 'handle': handle, 'column': '', 'kind': 'removed',
+                               'old_value': '', 'new_value': '', 'source': ''})
+                continue
+
+            if old_row is None:
+                report.append({'key': key, 'handle': handle, 'column': '', 'kind': 'added',
+                               'old_value': '', 'new_value': '', 'source': provenance.get('handle', '')})
+            else:
+                for column, value in row.items():
+                    if old_row.get(column, '') != value:
+                        report.append({'key': key, 'handle': handle, 'column': column, 'kind': 'changed',
+                                       'old_value': old_row.get(column, ''), 'new_value': value,
+                                       'source': provenance.get(column, '')})
+            report.extend({**conflict, 'handle': handle} for conflict in conflicts)
+            self.canonical[key] = row
+            self.provenance[key] = provenance
+        return report
+
+    def save(self):
+        """Write the merge state atomically."""
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({'format': STATE_FORMAT, 'rules': [self.default_rule, self.rules], 'sources': self.sources,
+                       'canonical': self.canonical, 'provenance': self.provenance}, file, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def write_csv(self, output_csv: str):
+        columns = self.columns()
+        rows = [[self.canonical[key].get(column, '') for column in columns] for key in sorted(self.canonical)]
+        write_csv_atomic(output_csv, columns, rows, encoding='latin-1')
+
+
+REPORT_COLUMNS = ['kind', 'key', 'handle', 'column', 'old_value', 'new_value', 'source']
+
+
+def write_report(report: List[dict], report_csv: str):
+    rows = [[entry.get(column, '') for column in REPORT_COLUMNS] for entry in report]
+    write_csv_atomic(report_csv, REPORT_COLUMNS, rows, encoding='latin-1')
+
+
+def merge_player_csvs(sources: Iterable = None, output_csv: str = DEFAULT_OUTPUT, report_csv: str = None,
+                      state_path: str = DEFAULT_STATE, rules: Dict[str, str] = None) -> List[dict]:
+    """Merge `sources` into output_csv, writing the diff report next to it; returns the report."""
+    merger = PlayerMerger(state_path, rules)
+    report = merger.merge(sources or DEFAULT_SOURCES)
+    merger.write_csv(output_csv)
+    write_report(report, report_csv or f"{os.path.splitext(output_csv)[0]}_diff.csv")
+    merger.save()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge the per-league player CSVs into one canonical dataset")
+    parser.add_argument('--source', action='append', help="CSV to merge, oldest first (default: all known files)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--report', help="diff report CSV (default: <output>_diff.csv)")
+    parser.add_argument('--state', default=DEFAULT_STATE, help="incremental merge state")
+    parser.add_argument('--rule', action='append', default=[], metavar='COLUMN=RULE',
+                        help="per-column rule, newest or oldest (e.g. agents=oldest)")
+    args = parser.parse_args()
+
+    column_rules = dict(rule.split('=', 1) for rule in args.rule)
+    diff = merge_player_csvs(args.source, args.output, args.report, args.state, column_rules)
+    kinds = {kind: sum(entry['kind'] == kind for entry in diff) for kind in ('added', 'changed', 'removed', 'conflict')}
+    print(f"Merged into {args.output}: " + ", ".join(f"{count} {kind}" for kind, count in kinds.items()))
@@ -0,0 +1,257 @@
+"""Precomputed per-league distributions for comparing players.
+
+For every (league, metric) pair this keeps the sorted values, the handle keys in the same order
+and running sums for the mean and standard deviation. Looking up a player's value is a dict
+lookup. Their rank / percentile within the league is a binary search on the sorted array, and
+their z-score is O(1).
+
+Updates are incremental: `refresh(players)` diffs the new dataset against the stored rows and
+only moves the values of players that changed. A changed value is one sorted insert / delete;
+nothing is rebuilt or re-sorted.
+
+    python player_percentiles.py TenZ                                  # full profile
+    python player_percentiles.py --top kill_assists_survived_traded --league "valorant challengers"
+"""
+import argparse
+import math
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from frontend.clean import normalise_key
+from player_dataset import dataset_signature, dedupe_players, load_players
+from player_similarity import METRIC_COLUMNS
+
+# Metrics where a smaller number is the better one
+LOWER_IS_BETTER = {'first_deaths_per_round'}
+
+
+class MetricDistribution:
+    """Sorted values of one metric in one league, with running sums for mean / std."""
+
+    def __init__(self):
+        self.values: List[float] = []
+        self.keys: List[str] = []
+        self.total = 0.0
+        self.total_squares = 0.0
+
+    def add(self, key: str, value: float):
+        index = bisect_right(self.values, value)
+        self.values.insert(index, value)
+        self.keys.insert(index, key)
+        self.total += value
+        self.total_squares += value * value
+
+    def remove(self, key: str, value: float):
+        index = bisect_left(self.values, value)
+        while self.keys[index] != key:  # Several players can share a value
+            index += 1
+        del self.values[index]
+        del self.keys[index]
+        self.total -= value
+        self.total_squares -= value * value
+
+    def __len__(self):
+        return len(self.values)
+
+    def mean(self) -> float:
+        return self.total / len(self.values) if self.values else math.nan
+
+    def std(self) -> float:
+        count = len(self.values)
+        if count < 2:
+            return math.nan
+        variance = (self.total_squares - self.total * self.total / count) / (count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def counts(self, value: float) -> Tuple[int, int]:
+        """(players strictly below `value`, players equal to it)."""
+        below = bisect_left(self.values, value)
+        return below, bisect_right(self.values, value) - below
+
+
+class LeagueDistributions:
+    """Per-league, per-metric distributions with O(1) / O(log n) rank, percentile and z-score lookups."""
+
+    def __init__(self, players: pd.DataFrame = None, metrics: List[str] = None):
+        self.metrics = metrics or METRIC_COLUMNS
+        self.rows: Dict[Tuple[str, str], Dict[str, float]] = {}  # (league, key) -> metric values
+        self.handles: Dict[Tuple[str, str], str] = {}
+        self.leagues_of: Dict[str, List[str]] = {}  # key -> leagues the handle plays in
+        self.distributions: Dict[Tuple[str, str], MetricDistribution] = {}
+        self.refresh(players if players is not None else load_players())
+
+    # Yield (league, key, handle, {metric: value}) for every player with a handle
+    def _records(self, players: pd.DataFrame):
+        values = players[self.metrics].astype('float64').to_numpy()
+        leagues = players['league'].astype(str).tolist()
+        for handle, league, row in zip(players['handle'].fillna('').tolist(), leagues, values):
+            key = normalise_key(handle)
+            if key:
+                yield league, key, handle, {metric: value for metric, value in zip(self.metrics, row.tolist())
+                                            if not math.isnan(value)}
+
+    def refresh(self, players: pd.DataFrame) -> int:
+        """Bring the distributions in line with `players`; returns how many player rows changed."""
+        incoming = {}
+        for league, key, handle, values in self._records(dedupe_players(players)):
+            incoming[(league, key)] = (handle, values)
+
+        changed = 0
+        for league_key in [league_key for league_key in self.rows if league_key not in incoming]:
+            self.remove(*league_key)
+            changed += 1
+        for (league, key), (handle, values) in incoming.items():
+            if self.rows.get((league, key)) != values:
+                self.upsert(league, key, values)
+                changed += 1
+            self.handles[(league, key)] = handle
+        return changed
+
+    def upsert(self, league: str, key: str, values: Dict[str, float]):
+        """Add or replace one player's values, moving only the metrics that changed."""
+        old_values = self.rows.get((league, key), {})
+        for metric in self.metrics:
+            old, new = old_values.get(metric), values.get(metric)
+            if old == new:
+                continue
+            distribution = self.distributions.setdefault((league, metric), MetricDistribution())
+            if old is not None:
+                distribution.remove(key, old)
+            if new is not None:
+                distribution.add(key, new)
+        self.rows[(league, key)] = dict(values)
+        leagues = self.leagues_of.setdefault(key, [])
+        if league not in leagues:
+            leagues.append(league)
+
+    def remove(self, league: str, key: str):
+        for metric, value in self.rows.pop((league, key), {}).items():
+            self.distributions[(league, metric)].remove(key, value)
+        self.handles.pop((league, key), None)
+        self.leagues_of[key].remove(league)
+
+    def _locate(self, handle: str, league: Optional[str]) -> Tuple[str, str]:
+        key = normalise_key(handle)
+        leagues = self.leagues_of.get(key) or []
+        if league is None and leagues:
+            league = leagues[0]
+        if (league, key) not in self.rows:
+            raise KeyError(f"Unknown player: {handle}" + (f" in {league}" if league else ""))
+        return league, key
+
+    def value(self, handle: str, metric: str, league: str = None) -> Optional[float]:
+        league, key = self._locate(handle, league)
+        return self.rows[(league, key)].get(metric)
+
+    def zscore(self, handle: str, metric: str, league: str = None) -> Optional[float]:
+        league, key = self._locate(handle, league)
+        value = self.rows[(league, key)].get(metric)
+        distribution = self.distributions.get((league, metric))
+        if value is None or distribution is None or not distribution.std():
+            return None
+        return (value - distribution.mean()) / distribution.std()
+
+    def rank(self, handle: str, metric: str, league: str = None) -> Optional[Tuple[int, int]]:
+        """(rank, players ranked) in the league, 1 being the best; ties share the better rank."""
+        league, key = self._locate(handle, league)
+        value = self.rows[(league, key)].get(metric)
+        if value is None:
+            return None
+        distribution = self.distributions[(league, metric)]
+        below, equal = distribution.counts(value)
+        better = below if metric in LOWER_IS_BETTER else len(distribution) - below - equal
+        return better + 1, len(distribution)
+
+    def percentile(self, handle: str, metric: str, league: str = None) -> Optional[float]:
+        """Share of the league this player beats (ties count half), 0-100."""
+        league, key = self._locate(handle, league)
+        value = self.rows[(league, key)].get(metric)
+        return None if value is None else self.percentile_of(value, metric, league)
+
+    def percentile_of(self, value: float, metric: str, league: str) -> Optional[float]:
+        """Percentile a raw value would have in the league (e.g. "what does 75% KAST mean in GC")."""
+        distribution = self.distributions.get((league, metric))
+        if not distribution:
+            return None
+        below, equal = distribution.counts(value)
+        beaten = len(distribution) - below - equal if metric in LOWER_IS_BETTER else below
+        return 100.0 * (beaten + 0.5 * equal) / len(distribution)
+
+    def top(self, metric: str, league: str, n: int = 10) -> List[Tuple[str, float]]:
+        """The n best players of a league for a metric, as (handle, value)."""
+        distribution = self.distributions.get((league, metric))
+        if not distribution:
+            return []
+        count, size = min(n, len(distribution)), len(distribution)
+        indexes = range(count) if metric in LOWER_IS_BETTER else range(size - 1, size - 1 - count, -1)
+        return [(self.handles[(league, distribution.keys[index])], distribution.values[index]) for index in indexes]
+
+    def profile(self, handle: str, league: str = None, metrics: Iterable[str] = None) -> pd.DataFrame:
+        """value / z-score / percentile / rank of one player for every metric."""
+        league, _ = self._locate(handle, league)
+        rows = []
+        for metric in metrics or self.metrics:
+            rank = self.rank(handle, metric, league)
+            rows.append({
+                'metric': metric, 'value': self.value(handle, metric, league),
+                'zscore': self.zscore(handle, metric, league), 'percentile': self.percentile(handle, metric, league),
+                'rank': rank[0] if rank else None, 'of': rank[1] if rank else None,
+            })
+        return pd.DataFrame(rows).set_index('metric')
+
+    def compare(self, handles: Iterable[str], metrics: Iterable[str] = None, league: str = None,
+                field: str = 'percentile') -> pd.DataFrame:
+        """One row per player, one column per metric, holding `field` (value, zscore, percentile or rank)."""
+        lookups = {'value': self.value, 'zscore': self.zscore, 'percentile': self.percentile,
+                   'rank': lambda *args: (self.rank(*args) or (None,))[0]}
+        lookup = lookups[field]
+        metrics = list(metrics or self.metrics)
+        table = {handle: [lookup(handle, metric, league) for metric in metrics] for handle in handles}
+        return pd.DataFrame.from_dict(table, orient='index', columns=metrics).astype('float64')
+
+    def league_summary(self, league: str) -> pd.DataFrame:
+        """count / mean / std / quartiles of every metric for one league."""
+        rows = {}
+        for metric in self.metrics:
+            distribution = self.distributions.get((league, metric))
+            if distribution:
+                quartiles = np.quantile(distribution.values, [0.25, 0.5, 0.75])
+                rows[metric] = [len(distribution), distribution.mean(), distribution.std(), *quartiles]
+        return pd.DataFrame.from_dict(rows, orient='index', columns=['count', 'mean', 'std', 'p25', 'p50', 'p75'])
+
+
+_default_distributions: Optional[LeagueDistributions] = None
+_default_signature = None
+
+
+def get_default_distributions() -> LeagueDistributions:
+    """Return process-wide distributions, refreshed incrementally only when the dataset changed on disk."""
+    global _default_distributions, _default_signature
+    signature = dataset_signature()
+    if _default_distributions is None:
+        _default_distributions = LeagueDistributions()
+    elif signature != _default_signature:
+        _default_distributions.refresh(load_players())
+    else:
+        return _default_distributions
+    _default_signature = dataset_signature()  # load_players may have just rebuilt the file
+    return _default_distributions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-league ranks, percentiles and z-scores")
+    parser.add_argument('handles', nargs='*', help="one handle for a profile, several to compare")
+    parser.add_argument('--league')
+    parser.add_argument('--top', metavar='METRIC', help="list the best players of --league for a metric")
+    parser.add_argument('--n', type=int, default=10)
+    args = parser.parse_args()
+
+    stats = LeagueDistributions()
+    if args.top:
+        for position, (name, number) in enumerate(stats.top(args.top, args.league, args.n), start=1):
+            print(f"{position:>3}. {name:<20} {number:g}")
+    elif len(args.handles) == 1:
+        print(stats.profile(args.handles[0], args.league).to_string())
+    elif args.handles:
+        print(stats.compare(args.handles, league=args.league).round(1).to_string())
@@ -0,0 +1,234 @@
+"""Bitset index over the player table's hard constraints, used to shrink the chatbot's context.
+
+Every (dimension, value) pair - region, language, gender, igl, status, org, agent role, league -
+maps to a Python int with bit i set for player row i. Multi-valued cells count for every value
+("eu|na" sets both regions, "English/French" both languages). A query ANDs the dimensions and ORs
+the values within one, which takes microseconds. Only the matching rows are then sent to Bedrock
+instead of the whole player pool.
+
+    python player_prefilter.py "active French-speaking EU initiators"
+"""
+import argparse
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+from player_dataset import ROLE_OF_AGENT, load_players
+
+DIMENSIONS = ['region', 'language', 'gender', 'igl', 'status', 'org', 'role', 'league']
+
+# Columns sent to the model for each candidate
+CONTEXT_COLUMNS = [
+    'handle', 'org', 'league', 'status', 'gender', 'igl', 'primary_language', 'regions', 'agents',
+    'rating', 'average_combat_score', 'kill_deaths', 'kill_assists_survived_traded', 'kills_per_round',
+    'assists_per_round', 'first_kills_per_round', 'first_deaths_per_round', 'headshot_percentage',
+    'clutch_success_percentage',
+]
+CONTEXT_LIMIT = 40  # Best-rated candidates sent as context
+
+# Words in a question that pin a dimension, on top of the values found in the data
+ALIASES = {
+    'region': {'europe': 'eu', 'european': 'eu', 'emea': 'eu', 'america': 'na', 'american': 'na', 'asia': 'ap',
+               'pacific': 'ap', 'japan': 'jp', 'brazil': 'sa', 'latam': 'sa', 'oceania': 'oce'},
+    'gender': {'female': 'female', 'women': 'female', 'woman': 'female', 'male': 'male', 'men': 'male'},
+    'igl': {'igl': 'true', 'igls': 'true'},
+    'status': {'active': 'active', 'archived': 'archived', 'inactive': 'archived', 'retired': 'archived'},
+    'league': {'challengers': 'valorant challengers', 'gc': 'valorant game changers',
+               'changers': 'valorant game changers', 'vct': 'valorant champions international',
+               'international': 'valorant champions international'},
+}
+
+# Region names of several words, matched before single words ("South America" isn't "america")
+REGION_PHRASES = {'south america': 'sa', 'latin america': 'sa', 'north america': 'na', 'asia pacific': 'ap',
+                  'asia-pacific': 'ap'}
+# Full team names, matched as written, for the org acronyms in the data
+ORG_NAMES = {
+    'Sentinels': 'SEN', 'Fnatic': 'FNC', 'Cloud9': 'C9', 'Heretics': 'TH', 'Leviatan': 'LEV', 'Furia': 'FUR',
+    'Vitality': 'VIT', 'Giants': 'GIA', 'Paper Rex': 'PRX', 'Team Liquid': 'TL', '100 Thieves': '100T',
+    'Karmine Corp': 'KC', 'Team Heretics': 'TH', 'Evil Geniuses': 'EG', 'Bilibili Gaming': 'BLG',
+}
+
+# A question about a whole team asks for role coverage and one IGL, not for a pool of only those
+TEAM_WORDS = {'team', 'teams', 'roster', 'rosters', 'squad', 'lineup'}
+COMPOSITION_DIMENSIONS = ('role', 'igl')
+
+_WORD_RE = re.compile(r"[A-Za-z0-9.]+")
+_ORG_RE = re.compile(r"(?=.*[A-Za-z])[A-Za-z0-9.]+")  # drops scraped junk such as "(+1)", "60%" or "201"
+_SENTENCE_END_RE = re.compile(r"(^|[.!?:;]\s*)$")
+
+Filter = Union[str, Iterable[str]]
+
+
+# Function to list the values of one dimension a player row has
+def row_values(player: dict, dimension: str) -> List[str]:
+    if dimension == 'region':
+        return list(player['regions']) if player['regions'] is not None else []
+    if dimension == 'language':
+        value = player['primary_language']
+        return [language.strip().lower() for language in value.split('/')] if isinstance(value, str) else []
+    if dimension == 'role':
+        agents = player['agents'] if player['agents'] is not None else ()
+        return sorted({ROLE_OF_AGENT[agent] for agent in agents if agent in ROLE_OF_AGENT})
+    if dimension == 'igl':
+        return [] if pd.isna(player['igl']) else [str(bool(player['igl'])).lower()]
+    value = player[dimension]
+    if not isinstance(value, str) or not value:
+        return []
+    if dimension == 'org':
+        return [value] if _ORG_RE.fullmatch(value) else []
+    return [value.lower()]
+
+
+class PlayerFilterIndex:
+    """Bitsets per (dimension, value) over the compiled player dataset."""
+
+    def __init__(self, players: pd.DataFrame = None):
+        self.players = (players if players is not None else load_players()).reset_index(drop=True)
+        self.size = len(self.players)
+        self.all = (1 << self.size) - 1
+        self.bits: Dict[str, Dict[str, int]] = {dimension: {} for dimension in DIMENSIONS}
+        rows: Dict[Tuple[str, str], List[int]] = {}
+        for row, player in enumerate(self.players.to_dict('records')):
+            for dimension in DIMENSIONS:
+                for value in row_values(player, dimension):
+                    rows.setdefault((dimension, value), []).append(row)
+        for (dimension, value), members in rows.items():
+            self.bits[dimension][value] = self._bitset(members)
+        self.ratings = self.players['rating'].astype('float64').fillna(-np.inf).to_numpy()
+
+    def _bitset(self, rows: List[int]) -> int:
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+    def rows(self, bitset: int) -> np.ndarray:
+        """Row indexes of the set bits."""
+        data = np.frombuffer(bitset.to_bytes((self.size + 7) // 8, 'little'), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(data, bitorder='little')[:self.size])
+
+    def values(self, dimension: str) -> List[str]:
+        return sorted(self.bits[dimension])
+
+    def select(self, **filters: Filter) -> int:
+        """Bitset of the players matching every dimension, any of the values given for one.
+
+        e.g. select(status='active', language='french', region='eu', role='initiator')
+        """
+        result = self.all
+        for dimension, wanted in filters.items():
+            if wanted is None:
+                continue
+            if dimension not in self.bits:
+                raise ValueError(f"Unknown filter: {dimension}")
+            wanted = [wanted] if isinstance(wanted, (str, bool)) else list(wanted)
+            matched = 0
+            for value in wanted:
+                value = str(value) if dimension == 'org' else str(value).lower()
+                matched |= self.bits[dimension].get(value, 0)
+            result &= matched
+        return result
+
+    def count(self, **filters: Filter) -> int:
+        return self.select(**filters).bit_count()
+
+    def candidates(self, limit: int = None, **filters: Filter) -> pd.DataFrame:
+        """Matching players, best rating first."""
+        rows = self.rows(self.select(**filters))
+        rows = rows[np.argsort(-self.ratings[rows], kind='stable')]
+        return self.players.iloc[rows[:limit] if limit else rows]
+
+    def parse(self, question: str) -> Dict[str, List[str]]:
+        """Pick the hard constraints out of a question, e.g. "active French-speaking EU initiators"."""
+        filters: Dict[str, List[str]] = {}
+
+        def add(dimension, value):
+            if value not in filters.setdefault(dimension, []):
+                filters[dimension].append(value)
+
+        # Phrases first, blanked out so their words aren't matched again on their own
+        text = question
+        for phrase, region in REGION_PHRASES.items():
+            for match in re.finditer(re.escape(phrase), text, flags=re.IGNORECASE):
+                add('region', region)
+                text = text[:match.start()] + ' ' * len(phrase) + text[match.end():]
+        for name, org in ORG_NAMES.items():
+            if ' ' in name and name in text and org in self.bits['org']:
+                add('org', org)
+                text = text.replace(name, ' ' * len(name))
+
+        for match in _WORD_RE.finditer(text):
+            word = match.group()
+            lower = word.lower().strip('.')
+            singular = lower[:-1] if lower.endswith('s') else lower
+            # A capital on the first word of a sentence says nothing about it being a name
+            sentence_start = bool(_SENTENCE_END_RE.search(question[:match.start()]))
+            if not sentence_start and ORG_NAMES.get(word) in self.bits['org']:
+                add('org', ORG_NAMES[word])  # "from Sentinels" is the team, not the role
+            elif lower in self.bits['region'] or lower in ALIASES['region']:
+                add('region', ALIASES['region'].get(lower, lower))
+            elif lower in self.bits['language']:
+                add('language', lower)
+            elif lower in self.bits['role'] or singular in self.bits['role']:
+                add('role', lower if lower in self.bits['role'] else singular)
+            elif lower in ALIASES['gender']:
+                add('gender', ALIASES['gender'][lower])
+            elif lower in ALIASES['igl']:
+                add('igl', ALIASES['igl'][lower])
+            elif lower in ALIASES['status']:
+                add('status', ALIASES['status'][lower])
+            elif lower in ALIASES['league']:
+                add('league', ALIASES['league'][lower])
+            elif (word in self.bits['org'] and len(word) > 1 and not sentence_start
+                  and (word.isupper() or any(char.isupper() for char in word[1:]))):
+                # Orgs are acronyms: only all-caps or mixed-case spellings ("SEN", "FaZe") count,
+                # so "All", "Free" or "Blue" in a sentence aren't read as teams
+                add('org', word)
+        # "male and female" asks for a mixed roster, not for a filter
+        if len(filters.get('gender', [])) > 1:
+            del filters['gender']
+        if TEAM_WORDS.intersection(word.lower() for word in _WORD_RE.findall(question)):
+            for dimension in COMPOSITION_DIMENSIONS:
+                filters.pop(dimension, None)
+        return filters
+
+    def context(self, question: str, limit: int = CONTEXT_LIMIT,
+                columns: List[str] = None) -> Tuple[Dict[str, List[str]], int, Optional[str]]:
+        """(filters, matching players, CSV of the best `limit` of them) for a question.
+
+        The CSV is None when the question has no hard constraints, or when no player meets them, so
+        the caller can fall back to the knowledge base alone instead of offering an empty pool.
+        """
+        filters = self.parse(question)
+        if not filters:
+            return filters, self.size, None
+        matches = self.candidates(**filters)
+        if matches.empty:
+            return filters, 0, None
+        table = matches.head(limit)[columns or CONTEXT_COLUMNS].copy()
+        for column in ('regions', 'agents'):
+            table[column] = table[column].map(lambda value: '|'.join(value) if value is not None else '')
+        return filters, len(matches), table.to_csv(index=False)
+
+
+_default_index: Optional[PlayerFilterIndex] = None
+
+
+def get_default_filter_index() -> PlayerFilterIndex:
+    """Return a process-wide index over the compiled player dataset."""
+    global _default_index
+    if _default_index is None:
+        _default_index = PlayerFilterIndex()
+    return _default_index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve a question's hard constraints to candidate players")
+    parser.add_argument('question')
+    parser.add_argument('--limit', type=int, default=CONTEXT_LIMIT)
+    args = parser.parse_args()
+
+    index = PlayerFilterIndex()
+    found, total, csv_text = index.context(args.question, args.limit)
+    print(f"Filters: {found or 'none'}; {total} matching players")
+    if csv_text:
+        print(csv_text)
@@ -0,0 +1,162 @@
+import csv
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+import requests
+from requests.adapters import HTTPAdapter
+from driver_pool import DriverPool, get_default_pool
+from http_cache import HttpCache
+from profile_resolver import VLR_SEARCH_URL, ProfileResolver, get_default_resolver, open_vlr_profile
+from scrape_journal import run_scrape_job
+from vlr_extract import extract_player_profile, fill_missing
+
+# Columns a vlr.gg profile page can fill in
+SCRAPED_COLUMNS = [
+    'first_name', 'last_name', 'agents', 'rounds_played', 'rating', 'average_combat_score', 'kill_deaths',
+    'kill_assists_survived_traded', 'average_damage_per_round', 'kills_per_round', 'assists_per_round',
+    'first_kills_per_round', 'first_deaths_per_round', 'country',
+]
+
+# Statuses worth waiting out instead of falling back to the browser
+HTTP_RETRY_STATUSES = {429, 500, 502, 503, 504}
+HTTP_RETRIES = 4
+HTTP_BACKOFF = 2.0  # seconds, doubled on every retry unless the server sends Retry-After
+HTTP_WORKERS = 8  # one per keep-alive connection of make_http_session
+
+# Function to build a keep-alive session; requests asks for gzip/deflate by default
+def make_http_session(pool_size: int = 8) -> requests.Session:
+    session = requests.Session()
+    session.headers.update({"User-Agent": "vct-hackathon-scraper (player stats research)"})
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# Function to log errors
+def log_error(player_name: str, error_message: str):
+    print(f"Error for {player_name}: {error_message}")
+
+# Function to load a player's profile in Chrome and extract every field from it
+def scrape_player_profile_browser(player_name: str, pool: DriverPool = None,
+                                  resolver: ProfileResolver = None) -> Optional[Dict[str, str]]:
+    """Open the `?timespan=all` profile once in a browser and return every extracted field."""
+    pool = pool or get_default_pool()
+    resolver = resolver or get_default_resolver()
+
+    try:
+        with pool.driver() as driver:
+            open_vlr_profile(driver, player_name, resolver)
+            time.sleep(3)  # Wait for the page to load
+            page_source = driver.page_source
+
+        return extract_player_profile(page_source) or None
+    except Exception as e:
+        log_error(player_name, str(e))
+        return None
+
+# Function to GET a page (through the cache if given), backing off on 429 / 5xx
+def fetch_page(url: str, session: requests.Session, cache: HttpCache = None) -> Tuple[int, bytes]:
+    for attempt in range(HTTP_RETRIES + 1):
+        if cache is not None:
+            response = cache.get(url, session=session, timeout=30)
+            status, body, headers = response.status, response.body, response.headers
+        else:
+            response = session.get(url, timeout=30)
+            status, body, headers = response.status_code, response.content, response.headers
+        if status not in HTTP_RETRY_STATUSES or attempt == HTTP_RETRIES:
+            return status, body
+        retry_after = {name.lower(): value for name, value in headers.items()}.get('retry-after', '')
+        time.sleep(float(retry_after) if retry_after.isdigit() else HTTP_BACKOFF * (2 ** attempt))
+    return status, body
+
+# Function to find a player's profile URL: the index first, then vlr.gg's own player search
+def resolve_profile_http(player_name: str, session: requests.Session, resolver: ProfileResolver,
+                         cache: HttpCache = None) -> Optional[str]:
+    profile_url = resolver.resolve(player_name)
+    if profile_url is not None:
+        return profile_url
+    status, body = fetch_page(VLR_SEARCH_URL.format(query=quote(player_name.strip())), session, cache)
+    if status != 200:
+        log_error(player_name, f"HTTP {status} searching vlr.gg")
+        return None
+    return resolver.ingest_search(player_name, body.decode('utf-8', errors='replace'))
+
+# Function to fetch a player's profile over plain HTTP (vlr.gg pages are server-rendered)
+def scrape_player_profile_http(player_name: str, session: requests.Session,
+                               resolver: ProfileResolver = None, cache: HttpCache = None) -> Optional[Dict[str, str]]:
+    """Fetch the `?timespan=all` profile without a browser. Returns None if it can't be done over HTTP."""
+    resolver = resolver or get_default_resolver()
+    try:
+        profile_url = resolve_profile_http(player_name, session, resolver, cache)
+        if profile_url is None:
+            return None  # Not found by the search either: only the browser path can look for it
+
+        full_url = profile_url.rstrip('/') + "/?timespan=all"
+        status, body = fetch_page(full_url, session, cache)
+    except requests.RequestException as e:
+        log_error(player_name, str(e))
+        return None
+    if status != 200:
+        log_error(player_name, f"HTTP {status} for {full_url}")
+        return None
+
+    # No agent table means the page didn't render server-side, let the browser try
+    profile = extract_player_profile(body.decode('utf-8', errors='replace'))
+    return profile if 'agents' in profile else None
+
+def scrape_player_profile(player_name: str, pool: DriverPool = None, resolver: ProfileResolver = None,
+                          session: requests.Session = None, cache: HttpCache = None,
+                          mode: str = 'http') -> Optional[Dict[str, str]]:
+    """Scrape one player's profile. mode='http' tries a plain HTTP fetch first and only falls back
+    to Chrome for handles neither the index nor vlr.gg's search can find, or pages that need JavaScript;
+    mode='browser' always uses Chrome."""
+    if mode == 'http':
+        profile = scrape_player_profile_http(player_name, session or make_http_session(), resolver, cache)
+        if profile is not None:
+            return profile
+        print(f"Falling back to the browser for {player_name}")
+    elif mode != 'browser':
+        raise ValueError(f"Unknown scrape mode: {mode}")
+    return scrape_player_profile_browser(player_name, pool, resolver)
+
+# Update every missing column in the CSV from a single visit per player
+def update_player_profiles_in_csv(input_csv: str, output_csv: str, pool: DriverPool = None, journal_path: str = None,
+                                  mode: str = 'http', workers: int = HTTP_WORKERS):
+    """Fill all empty scrapeable columns of the player CSV, visiting each profile page once.
+
+    Players are scraped `workers` at a time, sharing the session's keep-alive connections.
+    """
+    session = make_http_session(pool_size=workers)
+    cache = HttpCache()
+    with open(input_csv, mode='r', newline='', encoding='latin-1') as infile:
+        headers = next(csv.reader(infile))  # Read the headers
+    scraped_indexes = [headers.index(column) for column in SCRAPED_COLUMNS if column in headers]
+
+    def needs_scrape(row):
+        return any(not row[index].strip() for index in scraped_indexes if index < len(row))
+
+    def scrape(player_handle):
+        print(f"Missing data for {player_handle}. Scraping...")
+        profile = scrape_player_profile(player_handle, pool, session=session, cache=cache, mode=mode)
+        if profile is None:
+            print(f"Failed to update {player_handle}")
+        return profile
+
+    def apply(row, profile):
+        filled = fill_missing(headers, row, profile)
+        if filled:
+            print(f"Filled {', '.join(filled)} for {row[0]}")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        run_scrape_job(input_csv, output_csv, journal_path or f"{output_csv}.journal", scrape, apply,
+                       needs_scrape=needs_scrape, map_results=executor.map)
+
+if __name__ == "__main__":
+    input_csv_path = 'test-data/ch_final_updated.csv'
+    output_csv_path = 'test-data/ch_final_updated1.csv'
+    driver_pool = DriverPool(size=1, max_pages=50)  # Reuse one browser, restart it every 50 players
+    try:
+        update_player_profiles_in_csv(input_csv_path, output_csv_path, driver_pool)
+    finally:
+        driver_pool.close()
@@ -0,0 +1,145 @@
+"""Find players with similar stats, e.g. to replace a missing player in a team.
+
+Every metric is z-scored within the player's league, so a Challengers player is compared on how
+far they stand out in Challengers, not on raw numbers from a different level of play. Missing
+metrics count as league average. Queries are one vectorised distance computation over the whole
+player matrix. The region / language / role / league filters are boolean masks built once per
+value and cached.
+
+    python player_similarity.py TenZ --k 5 --region na --role duelist
+"""
+import argparse
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from frontend.clean import normalise_key
+from player_dataset import ROLE_OF_AGENT, dedupe_players, load_players
+
+# Stat columns compared, in the compiled dataset's units (percentages as 71.0)
+METRIC_COLUMNS = [
+    'rating', 'average_combat_score', 'kill_deaths', 'kill_assists_survived_traded', 'average_damage_per_round',
+    'kills_per_round', 'assists_per_round', 'first_kills_per_round', 'first_deaths_per_round',
+    'headshot_percentage', 'clutch_success_percentage',
+]
+
+
+# Function to z-score each metric within its league; missing values become 0 (the league mean)
+def league_zscores(players: pd.DataFrame, metrics: List[str] = None) -> np.ndarray:
+    metrics = metrics or METRIC_COLUMNS
+    values = players[metrics].astype('float64')
+    grouped = values.groupby(players['league'].astype(str), observed=True, sort=False)
+    std = grouped.transform('std').replace(0, np.nan)
+    scores = (values - grouped.transform('mean')) / std
+    return scores.fillna(0.0).to_numpy(dtype=np.float64)
+
+
+class SimilarityIndex:
+    """kNN over per-league z-scored stats, with optional region / language / role filters."""
+
+    def __init__(self, players: pd.DataFrame = None, metrics: List[str] = None, weights: Dict[str, float] = None):
+        # "ardiis" and "Ardiis" are one player: the same row per league as the percentiles use
+        self.players = dedupe_players(players if players is not None else load_players())
+        self.metrics = metrics or METRIC_COLUMNS
+        weight_vector = np.array([(weights or {}).get(metric, 1.0) for metric in self.metrics])
+        # Weights scale the axes, so the distance stays a plain squared Euclidean one
+        self.matrix = league_zscores(self.players, self.metrics) * np.sqrt(weight_vector)
+        self.keys = self.players['handle'].fillna('').map(normalise_key).to_numpy()
+        self.leagues = self.players['league'].astype(str).to_numpy()
+        self._masks: Dict[tuple, np.ndarray] = {}
+
+    def _value_mask(self, kind: str, value: str) -> np.ndarray:
+        cache_key = (kind, value.lower())
+        if cache_key not in self._masks:
+            value = value.lower()
+            if kind == 'region':
+                sets = self.players['regions']
+                mask = [value in (regions if regions is not None else ()) for regions in sets.tolist()]
+            elif kind == 'language':
+                # "English/French" speaks both
+                languages = self.players['primary_language'].astype('string').fillna('').str.lower().str.split('/')
+                mask = [value in spoken for spoken in languages.tolist()]
+            elif kind == 'role':
+                mask = [any(ROLE_OF_AGENT.get(agent) == value for agent in (agents if agents is not None else ()))
+                        for agents in self.players['agents'].tolist()]
+            elif kind == 'league':
+                mask = self.leagues == value
+            else:
+                raise ValueError(f"Unknown filter: {kind}")
+            self._masks[cache_key] = np.asarray(mask, dtype=bool)
+        return self._masks[cache_key]
+
+    def mask(self, region: str = None, language: str = None, role: str = None, league: str = None) -> np.ndarray:
+        """Boolean mask of the players passing every given filter."""
+        mask = np.ones(len(self.players), dtype=bool)
+        for kind, value in (('region', region), ('language', language), ('role', role), ('league', league)):
+            if value:
+                mask &= self._value_mask(kind, value)
+        return mask
+
+    def find(self, handle: str, league: str = None) -> int:
+        """Row of a player by handle (any spelling / case); `league` picks one of several namesakes."""
+        rows = np.flatnonzero(self.keys == normalise_key(handle))
+        if league:
+            rows = rows[self.leagues[rows] == league]
+        if not len(rows):
+            raise KeyError(f"Unknown player: {handle}")
+        return int(rows[0])
+
+    def nearest(self, vector: np.ndarray, k: int = 5, mask: np.ndarray = None,
+                exclude: Iterable[int] = ()) -> pd.DataFrame:
+        """The k players closest to a z-score vector among those in `mask`."""
+        distances = ((self.matrix - vector) ** 2).sum(axis=1)
+        allowed = mask.copy() if mask is not None else np.ones(len(distances), dtype=bool)
+        allowed[list(exclude)] = False
+        candidates = np.flatnonzero(allowed)
+        if not len(candidates):
+            return self.players.iloc[[]].assign(distance=[])
+        k = min(k, len(candidates))
+        top = candidates[np.argpartition(distances[candidates], k - 1)[:k]]
+        top = top[np.argsort(distances[top], kind='stable')]
+        return self.players.iloc[top].assign(distance=np.sqrt(distances[top]))
+
+    def similar(self, handle: str, k: int = 5, region: str = None, language: str = None, role: str = None,
+                league: str = None, same_league: bool = False, from_league: str = None,
+                exclude: Iterable[str] = ()) -> pd.DataFrame:
+        """Top-k players whose league-relative stats are closest to `handle`'s.
+
+        `league` restricts the candidates to one league (`same_league=True` uses the player's own),
+        `from_league` picks which namesake to start from, `exclude` drops handles (e.g. the rest of
+        the team).
+        """
+        row = self.find(handle, from_league)
+        if same_league:
+            league = self.leagues[row]
+        # The player never matches themselves, in this league or any other
+        excluded = [index for key in [self.keys[row], *map(normalise_key, exclude)]
+                    for index in np.flatnonzero(self.keys == key)]
+        return self.nearest(self.matrix[row], k, self.mask(region, language, role, league), excluded)
+
+
+_default_index: Optional[SimilarityIndex] = None
+
+
+def get_default_index() -> SimilarityIndex:
+    """Return a process-wide index over the compiled player dataset."""
+    global _default_index
+    if _default_index is None:
+        _default_index = SimilarityIndex()
+    return _default_index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find players with similar league-relative stats")
+    parser.add_argument('handle')
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--region', help="e.g. na, eu, ap")
+    parser.add_argument('--language', help="e.g. english")
+    parser.add_argument('--role', choices=['duelist', 'controller', 'initiator', 'sentinel'])
+    parser.add_argument('--league', help="only look in this league")
+    parser.add_argument('--same-league', action='store_true')
+    args = parser.parse_args()
+
+    index = SimilarityIndex()
+    matches = index.similar(args.handle, args.k, args.region, args.language, args.role, args.league, args.same_league)
+    columns = ['handle', 'org', 'league', 'primary_language', 'regions', 'agents', 'rating', 'distance']
+    print(matches[columns].to_string(index=False))
@@ -0,0 +1,157 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import quote
+from bs4 import SoupStrainer
+from html_parse import make_soup
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+VLR_BASE_URL = "https://www.vlr.gg"
+LIQUIPEDIA_BASE_URL = "https://liquipedia.net/valorant"
+VLR_SEARCH_URL = VLR_BASE_URL + "/search/?q={query}&type=players"
+# Next to this module rather than the working directory, so every scraper shares one index
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profile_index.json')
+
+# Canonical vlr.gg profile URL: https://www.vlr.gg/player/<id>/<slug>
+VLR_PLAYER_RE = re.compile(r'^(?:https?://(?:www\.)?vlr\.gg)?(/player/\d+(?:/[^/?#]+)?)')
+LIQUIPEDIA_PLAYER_RE = re.compile(r'^https?://liquipedia\.net/valorant/([^/?#]+)')
+
+
+# Function to normalise a handle into an index key
+def handle_key(handle: str) -> str:
+    return handle.strip().lower()
+
+
+# Function to turn any vlr.gg player link into its canonical profile URL
+def canonical_vlr_url(url: str) -> Optional[str]:
+    match = VLR_PLAYER_RE.match(url.strip())
+    if not match:
+        return None
+    return VLR_BASE_URL + match.group(1)
+
+
+class ProfileResolver:
+    """Map player handles to their vlr.gg / Liquipedia profile URLs, persisted on disk."""
+
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH):
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self.index: Dict[str, Dict[str, str]] = {}
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as file:
+                self.index = json.load(file)
+
+    def resolve(self, handle: str, site: str = 'vlr') -> Optional[str]:
+        """Return the known profile URL for a handle, or None if it hasn't been seen."""
+        entry = self.index.get(handle_key(handle), {})
+        if site == 'liquipedia' and 'liquipedia' not in entry:
+            # Liquipedia profile pages are named after the handle itself
+            return f"{LIQUIPEDIA_BASE_URL}/{quote(handle.strip().replace(' ', '_'))}"
+        return entry.get(site)
+
+    def record(self, handle: str, url: str, save: bool = True) -> bool:
+        """Remember a successful resolution. Returns False if the URL isn't a player profile."""
+        if canonical_vlr_url(url):
+            site, url = 'vlr', canonical_vlr_url(url)
+        elif LIQUIPEDIA_PLAYER_RE.match(url):
+            site, url = 'liquipedia', url.split('?')[0].split('#')[0].rstrip('/')
+        else:
+            return False
+
+        with self._lock:
+            entry = self.index.setdefault(handle_key(handle), {})
+            if entry.get(site) == url:
+                return True
+            entry[site] = url
+        if save:
+            self.save()
+        return True
+
+    def ingest_listing(self, html: str) -> int:
+        """Record every player link on a listing page (e.g. vlr.gg/stats). Returns how many were added."""
+        soup = make_soup(html, SoupStrainer('a', href=re.compile(r'^/player/')))
+        added = 0
+        for link in soup.select('a[href^="/player/"]'):
+            # Stats tables wrap the handle in a div, plain listings use the link text
+            handle_tag = link.find('div', class_='text-of') or link
+            handle = handle_tag.get_text(strip=True)
+            if handle and self.record(handle, link['href'], save=False):
+                added += 1
+        self.save()
+        return added
+
+    def ingest_search(self, handle: str, html: str) -> Optional[str]:
+        """Pick the handle's profile out of a vlr.gg player search page and record it.
+
+        Only an exact handle match (or a lone result) is taken, so a wrong player is never recorded.
+        """
+        soup = make_soup(html, SoupStrainer('a', href=re.compile(r'^/player/')))
+        results = []
+        for link in soup.select('a[href^="/player/"]'):
+            title_tag = link.find(class_='search-item-title') or link
+            results.append((title_tag.get_text(strip=True), link['href']))
+        exact = [href for title, href in results if handle_key(title) == handle_key(handle)]
+        href = exact[0] if exact else (results[0][1] if len(results) == 1 else None)
+        if href is None or not self.record(handle, href):
+            return None
+        return self.resolve(handle)
+
+    def save(self):
+        """Write the index atomically so a crash never leaves a half-written file.
+
+        Entries other processes (e.g. parallel scrape workers) saved since this one loaded it are kept.
+        """
+        with self._lock:
+            if os.path.exists(self.index_path):
+                try:
+                    with open(self.index_path, 'r', encoding='utf-8') as file:
+                        on_disk = json.load(file)
+                except (OSError, ValueError):
+                    on_disk = {}
+                for key, entry in on_disk.items():
+                    self.index[key] = {**entry, **self.index.get(key, {})}
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.index, file, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.index_path)
+
+
+# Function to search Google for a player's vlr.gg page (used only when the index has no entry)
+def google_vlr_profile(driver, player_name: str, query_suffix: str = 'vlr') -> str:
+    driver.get("https://www.google.com")
+    search_box = driver.find_element(By.NAME, 'q')
+    search_box.send_keys(f"{player_name} {query_suffix}")
+    search_box.send_keys(Keys.RETURN)
+
+    time.sleep(2)  # Wait for results to load
+    first_result = driver.find_elements(By.CSS_SELECTOR, 'h3')[0]
+    first_result.click()
+    time.sleep(0.5)  # Wait for the page to load
+    return driver.current_url
+
+
+# Function to open a player's `?timespan=all` profile, skipping Google when the URL is known
+def open_vlr_profile(driver, player_name: str, resolver: ProfileResolver, query_suffix: str = 'vlr') -> str:
+    profile_url = resolver.resolve(player_name)
+    if profile_url is None:
+        profile_url = google_vlr_profile(driver, player_name, query_suffix)
+        resolver.record(player_name, profile_url)
+
+    full_url = profile_url.rstrip('/') + "/?timespan=all"
+    driver.get(full_url)
+    return full_url
+
+
+_default_resolver = None
+
+
+def get_default_resolver() -> ProfileResolver:
+    """Return a process-wide resolver backed by profile_index.json."""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = ProfileResolver()
+    return _default_resolver
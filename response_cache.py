@@ -0,0 +1,169 @@
+"""Disk cache for chatbot answers, shared by every session of the Streamlit app.
+
+An answer is keyed on a hash of the normalised question, the system prompt, the knowledge-base id,
+the model ARN and any extra context sent with the question. The key doesn't depend on session, so
+two managers asking the same thing pay for one Bedrock call. Entries expire after `ttl` seconds,
+and the least recently used ones are evicted above `max_entries`. Each entry records the dataset
+version it was answered against, and a cache opened with another version drops them all.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+# Paths are resolved from the repository root, so launching the app from frontend/ finds the same files
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+# Dataset files whose changes invalidate cached answers
+DATASET_FILES = [os.path.join(REPO_DIR, 'final-data', 'players.parquet'),
+                 os.path.join(REPO_DIR, 'final-data', 'final_cleaned.csv')]
+DEFAULT_CACHE_DIR = os.path.join(REPO_DIR, '.response_cache')
+
+
+# Function to make "Build a team  from NA players?" and "build a team from na players" share a key
+def normalise_question(question: str) -> str:
+    return ' '.join(question.casefold().split()).rstrip('?!. ')
+
+
+# Function to fingerprint the dataset behind the knowledge base; KB_DATASET_VERSION overrides it
+def dataset_version(paths: Iterable[str] = None) -> str:
+    if os.environ.get('KB_DATASET_VERSION'):
+        return os.environ['KB_DATASET_VERSION']
+    parts = []
+    for path in paths or DATASET_FILES:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+        except OSError:
+            parts.append(f"{path}:missing")
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def response_key(question: str, system_prompt: str, knowledge_base_id: str, model_arn: str,
+                 context: str = None) -> str:
+    payload = json.dumps([normalise_question(question), system_prompt, knowledge_base_id, model_arn, context or ''])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """retrieve_and_generate answers (output text and citations) stored one JSON file per key.
+
+    A file's mtime is its last use: a hit only touches it, so reads never rewrite an entry.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, version: str = None, ttl: float = 24 * 3600,
+                 max_entries: int = 1000):
+        self.cache_dir = cache_dir
+        self.version = version if version is not None else dataset_version()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Keep (created_at, last_used) per key in memory so eviction doesn't rescan the directory
+        self.entries: Dict[str, dict] = {}
+        for name in os.listdir(cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(cache_dir, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    entry = json.load(file)
+                last_used = os.stat(path).st_mtime
+            except (OSError, ValueError):
+                continue  # Skip half-written entries
+            if entry.get('version') != self.version:
+                self._remove(path)  # Answered against another dataset
+                continue
+            self.entries[entry['key']] = {'created_at': entry['created_at'], 'last_used': last_used}
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + '.json')
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _write(self, key: str, entry: dict):
+        # A temp file of its own per write, so two sessions storing the same answer can't collide
+        with tempfile.NamedTemporaryFile('w', dir=self.cache_dir, suffix='.tmp', delete=False,
+                                         encoding='utf-8') as file:
+            json.dump(entry, file, default=str)
+        try:
+            os.replace(file.name, self._path(key))
+        except OSError:
+            self._remove(file.name)
+            raise
+
+    def get(self, key: str) -> Optional[dict]:
+        """The cached response ({'output': {'text'}, 'citations'}), or None when missing or expired."""
+        with self._lock:
+            meta = self.entries.get(key)
+            if meta is None:
+                return None
+            if time.time() - meta['created_at'] >= self.ttl:
+                del self.entries[key]
+                self._remove(self._path(key))
+                return None
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+            os.utime(self._path(key))  # Mark it recently used for the next process
+        except (OSError, ValueError):
+            with self._lock:
+                self.entries.pop(key, None)
+            return None
+        with self._lock:
+            meta['last_used'] = time.time()
+        return entry['response']
+
+    def put(self, key: str, response: dict):
+        """Store the parts of a retrieve_and_generate response the app renders."""
+        now = time.time()
+        entry = {
+            'key': key, 'version': self.version, 'created_at': now,
+            'response': {'output': response.get('output', {}), 'citations': response.get('citations', [])},
+        }
+        self._write(key, entry)
+        with self._lock:
+            self.entries[key] = {'created_at': now, 'last_used': now}
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used ones above max_entries."""
+        now = time.time()
+        with self._lock:
+            victims = [key for key, meta in self.entries.items() if now - meta['created_at'] >= self.ttl]
+            for key in victims:
+                del self.entries[key]
+            overflow = len(self.entries) - self.max_entries
+            if overflow > 0:
+                oldest = sorted(self.entries, key=lambda key: self.entries[key]['last_used'])[:overflow]
+                for key in oldest:
+                    del self.entries[key]
+                victims.extend(oldest)
+        for key in victims:
+            self._remove(self._path(key))
+
+    def clear(self):
+        with self._lock:
+            keys, self.entries = list(self.entries), {}
+        for key in keys:
+            self._remove(self._path(key))
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def get_default_response_cache() -> ResponseCache:
+    """Return the process-wide cache, reopened (and so invalidated) when the dataset version changes."""
+    global _default_cache
+    version = dataset_version()
+    if _default_cache is None or _default_cache.version != version:
+        _default_cache = ResponseCache(version=version)
+    return _default_cache
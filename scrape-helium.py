@@ -1,7 +1,13 @@
 import csv
 import time
-from helium import start_chrome, find_all, click, write, press, go_to, kill_browser
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing.util import Finalize
+from helium import start_chrome, kill_browser, get_driver
+from driver_pool import browser_died
+from html_parse import VLR_PROFILE_STRAINER, make_soup
+from profile_resolver import ProfileResolver, get_default_resolver, open_vlr_profile
+from scrape_journal import run_scrape_job
 
 # Function to log errors to a CSV file
 def log_error(player_name: str, error_message: str, error_log_csv: str):
@@ -10,34 +16,35 @@ def log_error(player_name: str, error_message: str, error_log_csv: str):
         writer = csv.writer(error_file)
         writer.writerow([player_name, error_message])  # Write player name and error message
 
-# Function to perform Google search, open first link, append timespan, and scrape data
-def search_and_scrape(player_name: str, error_log_csv: str) -> tuple:
-    """Search for the player and scrape their top agents."""
-    driver = start_chrome("https://www.google.com", headless=True)  # Run in headless mode for faster performance
-    
+# Function to start this process's browser once; worker processes skip atexit, so it is closed by a finalizer
+def start_worker_browser():
+    start_chrome(headless=True)  # Run in headless mode for faster performance
+    Finalize(None, kill_browser, exitpriority=10)
+
+# Function to get this process's warm browser, starting a new one if there is none (or the last one died)
+def worker_browser():
+    driver = get_driver()
+    if driver is None:
+        start_chrome(headless=True)
+        driver = get_driver()
+    return driver
+
+# Function to open the player's VLR profile, append timespan, and scrape data
+def search_and_scrape(player_name: str, error_log_csv: str, resolver: ProfileResolver = None) -> tuple:
+    """Scrape the player's top agents, reusing this process's browser."""
+    resolver = resolver or get_default_resolver()
+    driver = worker_browser()
+
     try:
-        # Step 1: Perform Google search
-        search_query = f"{player_name} vlr"
-        write(search_query, into="Search")
-        press(press.ENTER)
-        time.sleep(2)  # Wait for results to load
-        
-        # Step 2: Click the first result
-        result = find_all('h3')[0]
-        click(result)
-        time.sleep(1)  # Wait for the page to load
-
-        # Step 3: Get current URL, append `/?timespan=all`
-        current_url = driver.current_url
-        full_url = current_url + "/?timespan=all"
-        go_to(full_url)
-        time.sleep(3)  # Wait for the new page to load
-
-        # Step 4: Extract page source and parse with BeautifulSoup
+        # Open the player's VLR profile directly (Google is only used for unknown handles)
+        open_vlr_profile(driver, player_name, resolver)
+        time.sleep(3)  # Wait for the page to load
+
+        # Extract page source and parse with BeautifulSoup
         page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
+        soup = make_soup(page_source, VLR_PROFILE_STRAINER)
 
-        # Step 5: Target the table rows and extract alt texts of agent images
+        # Target the table rows and extract alt texts of agent images
         img_tags = soup.select('tr img')  # Select all img tags within tr elements
         alt_texts = [img.get('alt') for img in img_tags if img.get('alt')]  # Extract alt texts
 
@@ -49,55 +56,65 @@ def search_and_scrape(player_name: str, error_log_csv: str) -> tuple:
         error_message = str(e)
         print(f"An error occurred while scraping {player_name}: {error_message}")
         log_error(player_name, error_message, error_log_csv)
+        if browser_died(e):
+            kill_browser()  # The next player starts a fresh browser
         return (player_name, None)  # Return None to indicate an error occurred
-    finally:
-        kill_browser()  # Ensure the browser is closed
 
 # Function to process one player at a time
 def process_player(row, error_log_csv):
     player_handle = row[0]
     print(f"Fetching agent data for {player_handle}...")
-    agents = search_and_scrape(player_handle, error_log_csv)
+    _, agents = search_and_scrape(player_handle, error_log_csv)
     return (player_handle, agents)  # Return scraped agents or None
 
+# Function to scrape one player and return only the agents, used by both modes below
+def scrape_agents(player_handle: str, error_log_csv: str):
+    player_name, agents = process_player([player_handle], error_log_csv)
+    if agents:
+        print(f"Player: {player_name}, Agents: {agents}")
+    return agents or None  # Empty results are retried on the next run
+
+def apply_agents(row, agents):
+    row[6] = agents  # Update agents data
+
 # Function to handle sequential scraping and update the CSV
-def update_agents_in_csv_sequential(input_csv: str, output_csv: str, error_log_csv: str, start_row: int):
-    """Update agents in the CSV by scraping data for all players, one by one."""
-    rows = []  # To store all rows temporarily
-    players_to_process = []  # For players that need scraping
+def update_agents_in_csv_sequential(input_csv: str, output_csv: str, error_log_csv: str, journal_path: str = None):
+    """Update agents in the CSV by scraping data for all players, one by one.
 
+    Finished players are written to a journal, so rerunning after a crash resumes where it stopped.
+    """
     # Open the CSV file with 'latin-1' encoding to avoid UnicodeDecodeError
-    with open(input_csv, mode='r', newline='', encoding='latin-1') as infile:
-        reader = csv.reader(infile)
-        headers = next(reader)  # Read the headers
-        rows.append(headers)  # Store the headers
-        
-        # Loop through each row and add rows to the list for processing
-        for idx, row in enumerate(reader, start=2):  # Start counting from row 2 (first row is headers)
-            if idx < start_row:
-                rows.append(row)  # Add row unchanged if before start_row
-                continue
-
-            players_to_process.append(row)  # Add all rows for processing
-
-    # Process each player sequentially
-    for row in players_to_process:
-        player_name, agents = process_player(row, error_log_csv)
-        if agents:
-            # Update agents data
-            row[6] = agents
-            print(f"Player: {player_name}, Agents: {agents}")
-        rows.append(row)  # Add the updated row to rows
-
-    # Now write all rows to the new output CSV
-    with open(output_csv, mode='w', newline='', encoding='utf-8') as outfile:
-        writer = csv.writer(outfile)
-        writer.writerows(rows)  # Write all rows to the new output file
-
-# Example usage
-input_csv_path = r'test-data\\two.csv'  # Original input file
-output_csv_path = r'test-data\\two_final.csv'  # New output file
-error_log_csv = r'test-data\\two_error_log.csv'  # Error log file
-start_row = 0  # You can adjust this to start from a specific row
-
-update_agents_in_csv_sequential(input_csv_path, output_csv_path, error_log_csv, start_row)
+    try:
+        run_scrape_job(input_csv, output_csv, journal_path or f"{output_csv}.journal",
+                       partial(scrape_agents, error_log_csv=error_log_csv), apply_agents,
+                       encoding='latin-1', output_encoding='utf-8')
+    finally:
+        kill_browser()  # One browser served every player
+
+# Function to scrape players in parallel, one headless browser per worker process
+def update_agents_in_csv_parallel(input_csv: str, output_csv: str, error_log_csv: str, journal_path: str = None,
+                                  workers: int = 4, chunk_size: int = 8):
+    """Update agents in the CSV using a pool of worker processes.
+
+    Helium keeps its browser in a module global, so each process starts its own browser once and
+    reuses it for all the players it is given. Players are handed out in chunks and results are
+    journaled and written back in input order.
+    """
+    with ProcessPoolExecutor(max_workers=workers, initializer=start_worker_browser) as executor:
+        run_scrape_job(input_csv, output_csv, journal_path or f"{output_csv}.journal",
+                       partial(scrape_agents, error_log_csv=error_log_csv), apply_agents,
+                       encoding='latin-1', output_encoding='utf-8',
+                       map_results=partial(executor.map, chunksize=chunk_size))
+
+if __name__ == "__main__":
+    # Example usage
+    input_csv_path = r'test-data\\two.csv'  # Original input file
+    output_csv_path = r'test-data\\two_final.csv'  # New output file
+    error_log_csv = r'test-data\\two_error_log.csv'  # Error log file
+    journal_path = r'test-data\\two_final.journal'  # Finished players; delete it to start from scratch
+    workers = 4  # Set to 1 to scrape one player at a time
+
+    if workers > 1:
+        update_agents_in_csv_parallel(input_csv_path, output_csv_path, error_log_csv, journal_path, workers=workers)
+    else:
+        update_agents_in_csv_sequential(input_csv_path, output_csv_path, error_log_csv, journal_path)
@@ -0,0 +1,126 @@
+import csv
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+# Function to fingerprint a job's input file by content, so a journal is only reused for the same input
+def file_signature(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ScrapeJournal:
+    """Append-only JSON-lines log of finished handles and what was scraped for them.
+
+    With a `signature` (see file_signature), the first line records the input the results belong
+    to, and a journal written for any other input is discarded rather than replayed.
+    """
+
+    def __init__(self, journal_path: str, sync_every: int = 1, signature: Optional[str] = None):
+        self.journal_path = journal_path
+        self.sync_every = sync_every  # fsync once per this many records
+        self.signature = signature
+        self._unsynced = 0
+        self.results: Dict[str, Any] = {}
+        header = None
+        if os.path.exists(journal_path):
+            with open(journal_path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line from a crash mid-write
+                    if 'input' in entry:
+                        header = entry['input']
+                    else:
+                        self.results[entry['handle']] = entry['result']
+
+        if signature is not None and header != signature:
+            if self.results:
+                print(f"Discarding {journal_path}: it was written for a different input")
+            self.results = {}
+            self._file = open(journal_path, 'w', encoding='utf-8')
+            self._file.write(json.dumps({"input": signature}) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        else:
+            self._file = open(journal_path, 'a', encoding='utf-8')
+
+    def is_done(self, handle: str) -> bool:
+        """A handle is done once it has a non-empty result; failures are retried on the next run."""
+        return self.results.get(handle) is not None
+
+    def record(self, handle: str, result: Any):
+        """Append one finished handle; it survives a crash of this process as soon as this returns."""
+        self.results[handle] = result
+        self._file.write(json.dumps({"handle": handle, "result": result}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        """Force everything recorded so far onto disk."""
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        if self._unsynced:
+            self.sync()
+        self._file.close()
+
+
+# Function to write rows to a CSV via a temp file so the output is never half-written
+def write_csv_atomic(output_csv: str, headers: List[str], rows: List[List[str]], encoding: str = 'utf-8'):
+    tmp_path = f"{output_csv}.tmp"
+    with open(tmp_path, mode='w', newline='', encoding=encoding) as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    os.replace(tmp_path, output_csv)
+
+
+def run_scrape_job(input_csv: str, output_csv: str, journal_path: str,
+                   scrape: Callable[[str], Any], apply: Callable[[List[str], Any], None],
+                   needs_scrape: Optional[Callable[[List[str]], bool]] = None,
+                   encoding: str = 'latin-1', output_encoding: Optional[str] = None,
+                   sync_every: int = 1,
+                   map_results: Callable[[Callable[[str], Any], List[str]], Iterable[Any]] = map):
+    """Scrape every pending handle in input_csv, journaling each one, then merge into output_csv.
+
+    Rerunning with the same journal skips handles that already have a result, so a job killed
+    at player 900 of 1,000 only redoes the last 100. The journal is tied to the input file's
+    content and starts over if input_csv has changed since it was written. Pass an executor's `map` as map_results to
+    scrape in parallel; results must come back in the order of the handles given to it.
+    """
+    with open(input_csv, mode='r', newline='', encoding=encoding) as infile:
+        reader = csv.reader(infile)
+        headers = next(reader)  # Read the headers
+        rows = list(reader)
+
+    journal = ScrapeJournal(journal_path, sync_every=sync_every, signature=file_signature(input_csv))
+    try:
+        wanted = [row for row in rows if needs_scrape is None or needs_scrape(row)]
+        pending = [row for row in wanted if not journal.is_done(row[0])]
+        print(f"{len(wanted) - len(pending)} players already done, {len(pending)} to scrape"
+              f" ({len(rows) - len(wanted)} need nothing)")
+
+        # Player handle is the first column; the same handle can be listed twice in the CSV
+        handles = list(dict.fromkeys(row[0] for row in pending))
+        for player_handle, result in zip(handles, map_results(scrape, handles)):
+            journal.record(player_handle, result)
+    finally:
+        journal.close()
+
+    # Merge every journaled result into the rows and write the output in one go
+    for row in rows:
+        result = journal.results.get(row[0])
+        if result is not None:
+            apply(row, result)
+    write_csv_atomic(output_csv, headers, rows, encoding=output_encoding or encoding)
+    print(f"Updated data has been saved to {output_csv}")
@@ -0,0 +1,282 @@
+"""Build 5-player rosters locally, following the team-formation rules of the chatbot's system prompt.
+
+Every roster:
+- shares at least one language and one region
+- covers duelist, controller, initiator and sentinel between its players' agents
+- has one IGL; if the pool has none, the player with the best leadership proxy (KAST, clutch, first
+  kills) leads
+- can be required to include given genders (e.g. a mixed roster)
+
+Players are scored once, vectorised, from their league-relative z-scores. Rosters are then searched
+with branch-and-bound inside every language x region pool, so the result is deterministic and the
+LLM only has to explain it.
+
+    python team_optimiser.py --language english --region na --top 3
+    python team_optimiser.py --league "valorant game changers" --mixed
+"""
+import argparse
+import heapq
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from frontend.clean import normalise_key
+from player_dataset import AGENT_ROLES, ROLE_OF_AGENT, load_players
+from player_similarity import METRIC_COLUMNS, league_zscores
+
+TEAM_SIZE = 5
+ROLES = list(AGENT_ROLES)
+ROLE_BITS = {role: 1 << index for index, role in enumerate(ROLES)}
+ALL_ROLES = (1 << len(ROLES)) - 1
+
+# Individual score: offence, support, precision and clutch, minus dying first
+PERFORMANCE_WEIGHTS = {
+    'rating': 2.0, 'average_combat_score': 1.0, 'kills_per_round': 1.0, 'kill_assists_survived_traded': 1.0,
+    'assists_per_round': 0.5, 'headshot_percentage': 0.5, 'clutch_success_percentage': 0.5,
+    'first_kills_per_round': 0.5, 'first_deaths_per_round': -0.5,
+}
+LEADERSHIP_WEIGHTS = {'kill_assists_survived_traded': 1.0, 'clutch_success_percentage': 1.0, 'first_kills_per_round': 0.5}
+LEADERSHIP_WEIGHT = 1.0  # How much the roster's leader adds to the roster score
+IGL_BONUS = 3.0  # Leadership bonus of a real IGL over the stats proxy
+MAX_IGLS = 1
+CANDIDATES_PER_BUCKET = 12  # Best players kept per role / IGL / gender bucket of a pool
+
+
+class Roster(NamedTuple):
+    score: float
+    handles: Tuple[str, ...]
+    language: str
+    region: str
+    leader: str
+    players: pd.DataFrame
+
+
+# Function to turn a player's agents into a bitmask of the roles they cover
+def role_mask(agents) -> int:
+    mask = 0
+    for agent in (agents if agents is not None else ()):
+        role = ROLE_OF_AGENT.get(agent)
+        if role:
+            mask |= ROLE_BITS[role]
+    return mask
+
+
+# Function to split "English/French" into the languages a player can use
+def spoken_languages(value) -> List[str]:
+    if not isinstance(value, str):
+        return []
+    return [language.strip().lower() for language in value.split('/') if language.strip()]
+
+
+class TeamOptimiser:
+    """Deterministic roster search over the compiled player dataset."""
+
+    def __init__(self, players: pd.DataFrame = None, performance_weights: Dict[str, float] = None):
+        self.players = (players if players is not None else load_players()).reset_index(drop=True)
+        scores = league_zscores(self.players, METRIC_COLUMNS)
+        column = {metric: index for index, metric in enumerate(METRIC_COLUMNS)}
+
+        def weighted(weights):
+            vector = np.zeros(len(METRIC_COLUMNS))
+            for metric, weight in weights.items():
+                vector[column[metric]] = weight
+            return scores @ vector
+
+        self.score = weighted(performance_weights or PERFORMANCE_WEIGHTS)
+        self.is_igl = self.players['igl'].fillna(False).to_numpy(dtype=bool)
+        self.leadership = weighted(LEADERSHIP_WEIGHTS) + IGL_BONUS * self.is_igl
+        self.roles = np.array([role_mask(agents) for agents in self.players['agents'].tolist()], dtype=np.int64)
+        self.languages = [spoken_languages(value) for value in self.players['primary_language'].tolist()]
+        self.regions = [list(value) if value is not None else [] for value in self.players['regions'].tolist()]
+        self.genders = self.players['gender'].astype('string').fillna('').to_numpy(dtype=object)
+        self.handles = self.players['handle'].fillna('').to_numpy(dtype=object)
+        self.keys = np.array([normalise_key(handle) for handle in self.handles], dtype=object)
+
+    def _pools(self, allowed: np.ndarray, language: Optional[str], region: Optional[str]):
+        """Yield (language, region, candidate rows) for every language x region pool of 5+ players."""
+        pools: Dict[Tuple[str, str], List[int]] = {}
+        for row in np.flatnonzero(allowed):
+            for spoken in self.languages[row]:
+                if language and spoken != language:
+                    continue
+                for player_region in self.regions[row]:
+                    if region and player_region != region:
+                        continue
+                    pools.setdefault((spoken, player_region), []).append(int(row))
+        for (pool_language, pool_region), rows in sorted(pools.items()):
+            if len(rows) >= TEAM_SIZE:
+                yield pool_language, pool_region, np.array(rows)
+
+    def _leader(self, rows: Sequence[int]) -> int:
+        """The roster's IGL, or the best leadership proxy when it has none."""
+        igls = [row for row in rows if self.is_igl[row]]
+        return igls[0] if igls else max(rows, key=lambda row: self.leadership[row])
+
+    def _trim(self, rows: np.ndarray, require_genders: Sequence[str]) -> np.ndarray:
+        """Keep the best players of every role, IGL and required-gender bucket, best score first.
+
+        A handle listed twice (e.g. in two leagues) keeps only its best-scoring row."""
+        ordered = rows[np.argsort(-self.score[rows], kind='stable')]
+        _, first = np.unique(self.keys[ordered], return_index=True)
+        ordered = ordered[np.sort(first)]
+        buckets = [ordered[(self.roles[ordered] & bit) != 0] for bit in ROLE_BITS.values()]
+        buckets.append(ordered[self.is_igl[ordered]])
+        buckets.append(ordered[np.argsort(-self.leadership[ordered], kind='stable')])
+        buckets.extend(ordered[self.genders[ordered] == gender] for gender in require_genders)
+        buckets.append(ordered)
+        keep = np.unique(np.concatenate([bucket[:CANDIDATES_PER_BUCKET] for bucket in buckets]))
+        return keep[np.argsort(-self.score[keep], kind='stable')]
+
+    def _search(self, rows: np.ndarray, fixed: List[int], require_genders: Sequence[str], top: int,
+                best: List[Tuple[float, Tuple[int, ...]]], seen: set):
+        """Branch-and-bound over the ways to complete `fixed` with players from `rows` (sorted by
+        score, best first), pushing every roster good enough into the `best` min-heap."""
+        count = len(rows)
+        score, roles, igl = self.score[rows], self.roles[rows], self.is_igl[rows]
+        genders = self.genders[rows]
+        # suffix_roles[i] / suffix_genders[i]: what rows i.. can still bring in
+        suffix_roles = np.zeros(count + 1, dtype=np.int64)
+        suffix_genders = [set() for _ in range(count + 1)]
+        for index in range(count - 1, -1, -1):
+            suffix_roles[index] = suffix_roles[index + 1] | roles[index]
+            suffix_genders[index] = suffix_genders[index + 1] | {genders[index]}
+        pool_has_igl = bool(igl.any() or self.is_igl[fixed].any())
+        max_leadership = max(self.leadership[rows].max(initial=-np.inf), self.leadership[fixed].max(initial=-np.inf))
+
+        def threshold():
+            return best[0][0] if len(best) >= top else -np.inf
+
+        def visit(start: int, chosen: List[int], total: float, covered: int, igls: int, present: set):
+            slots = TEAM_SIZE - len(chosen)
+            if slots == 0:
+                if covered != ALL_ROLES or (pool_has_igl and igls == 0):
+                    return
+                if not present.issuperset(require_genders):
+                    return
+                team_score = total + LEADERSHIP_WEIGHT * self.leadership[self._leader(chosen)]
+                members = tuple(sorted(chosen))
+                if members in seen or team_score <= threshold():
+                    return
+                seen.add(members)
+                if len(best) >= top:
+                    heapq.heapreplace(best, (team_score, members))
+                else:
+                    heapq.heappush(best, (team_score, members))
+                return
+            for index in range(start, count - slots + 1):
+                # Rows are sorted by score, so the next `slots` rows are the best this branch can still add
+                if total + score[index:index + slots].sum() + LEADERSHIP_WEIGHT * max_leadership <= threshold():
+                    return
+                if (covered | suffix_roles[index]) != ALL_ROLES:
+                    return
+                if not (present | suffix_genders[index]).issuperset(require_genders):
+                    return
+                if igl[index] and igls >= MAX_IGLS:
+                    continue
+                chosen.append(int(rows[index]))
+                visit(index + 1, chosen, total + score[index], covered | int(roles[index]), igls + int(igl[index]),
+                      present | {genders[index]})
+                chosen.pop()
+
+        covered = 0
+        for row in fixed:
+            covered |= int(self.roles[row])
+        visit(0, list(fixed), float(self.score[fixed].sum()), covered, int(self.is_igl[fixed].sum()),
+              set(self.genders[fixed]))
+
+    def best_rosters(self, top: int = 5, language: str = None, region: str = None, league: str = None,
+                     require_genders: Iterable[str] = (), active_only: bool = True,
+                     include: Iterable[str] = (), exclude: Iterable[str] = ()) -> List[Roster]:
+        """The `top` highest-scoring rosters meeting every rule, best first.
+
+        `language` / `region` pin the shared language or region, `league` limits the pool to one
+        league, `require_genders` (e.g. ['Male', 'Female']) the genders that must be present and
+        `exclude` drops handles. `include` handles are always in the roster.
+        """
+        require_genders = list(require_genders)
+        allowed = np.ones(len(self.players), dtype=bool)
+        if active_only:
+            allowed &= (self.players['status'].astype('string') == 'active').fillna(False).to_numpy(dtype=bool)
+        if league:
+            allowed &= (self.players['league'].astype('string') == league).fillna(False).to_numpy(dtype=bool)
+        excluded = {normalise_key(handle) for handle in exclude}
+        allowed &= np.array([key not in excluded for key in self.keys], dtype=bool)
+        forced = {normalise_key(handle) for handle in include}
+        if len(forced) > TEAM_SIZE:
+            raise ValueError(f"A roster has {TEAM_SIZE} players, {len(forced)} were included")
+
+        best: List[Tuple[float, Tuple[int, ...]]] = []
+        seen: set = set()
+        labels: Dict[Tuple[int, ...], Tuple[str, str]] = {}
+        for pool_language, pool_region, rows in self._pools(allowed, language and language.lower(),
+                                                            region and region.lower()):
+            # Forced players are fixed up front (even if trimming would drop them); the search fills the rest
+            is_forced = np.isin(self.keys[rows], list(forced))
+            fixed = {}
+            for row in rows[is_forced]:
+                key = self.keys[row]
+                if key not in fixed or self.score[row] > self.score[fixed[key]]:
+                    fixed[key] = int(row)
+            if len(fixed) < len(forced):
+                continue
+            if int(self.is_igl[list(fixed.values())].sum()) > MAX_IGLS:
+                raise ValueError(f"At most {MAX_IGLS} IGL per roster, the included players have more")
+            candidates = self._trim(rows[~is_forced], require_genders)
+            fixed = list(fixed.values())
+            before = set(seen)
+            self._search(candidates, fixed, require_genders, top, best, seen)
+            for members in seen - before:
+                labels[members] = (pool_language, pool_region)
+
+        rosters = []
+        for score, members in sorted(best, reverse=True):
+            rows = list(members)
+            leader = self._leader(rows)
+            language_label, region_label = labels[members]
+            rosters.append(Roster(round(float(score), 3), tuple(self.handles[row] for row in rows), language_label,
+                                  region_label, self.handles[leader], self.players.iloc[rows]))
+        return rosters
+
+
+# Function to summarise a roster for the chatbot, which only has to explain it
+def describe_roster(roster: Roster) -> str:
+    lines = [f"Roster (score {roster.score}, shared language: {roster.language}, shared region: {roster.region}, "
+             f"leader: {roster.leader}):"]
+    for _, player in roster.players.iterrows():
+        agents = ', '.join(player['agents']) if player['agents'] is not None else ''
+        lines.append(f"- {player['handle']} ({player['org']}, {player['league']}): agents {agents}; "
+                     f"rating {player['rating']}, ACS {player['average_combat_score']}, "
+                     f"KAST {player['kill_assists_survived_traded']}%, clutch {player['clutch_success_percentage']}%, "
+                     f"IGL {bool(player['igl']) if pd.notna(player['igl']) else 'unknown'}")
+    return "\n".join(lines)
+
+
+_default_optimiser: Optional[TeamOptimiser] = None
+
+
+def get_default_optimiser() -> TeamOptimiser:
+    """Return a process-wide optimiser over the compiled player dataset."""
+    global _default_optimiser
+    if _default_optimiser is None:
+        _default_optimiser = TeamOptimiser()
+    return _default_optimiser
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the best 5-player rosters from the player dataset")
+    parser.add_argument('--top', type=int, default=3)
+    parser.add_argument('--language')
+    parser.add_argument('--region')
+    parser.add_argument('--league')
+    parser.add_argument('--mixed', action='store_true', help="require both male and female players")
+    parser.add_argument('--include', action='append', default=[], help="handle that must be in the roster")
+    parser.add_argument('--exclude', action='append', default=[])
+    args = parser.parse_args()
+
+    optimiser = TeamOptimiser()
+    results = optimiser.best_rosters(args.top, args.language, args.region, args.league,
+                                     ['Male', 'Female'] if args.mixed else [], include=args.include,
+                                     exclude=args.exclude)
+    for result in results:
+        print(describe_roster(result), end="\n\n")
+    if not results:
+        print("No roster satisfies these constraints")
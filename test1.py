@@ -1,4 +1,5 @@
 import json
+import json_loader
 from typing import List
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
@@ -15,14 +16,14 @@ load_dotenv()
 
 def load_json_files(file_paths: List[str]) -> List[Document]:
     documents = []
-    for file_path in file_paths:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            # Convert the JSON data to a string representation
-            content = json.dumps(data, indent=2)
-            # Create a Document object with the content and metadata
-            doc = Document(page_content=content, metadata={"source": file_path})
-            documents.append(doc)
+    # Load every file concurrently (decoded objects are cached by mtime + size)
+    json_data = json_loader.load_json_files({file_path: file_path for file_path in file_paths})
+    for file_path, data in json_data.items():
+        # Convert the JSON data to a string representation
+        content = json.dumps(data, indent=2)
+        # Create a Document object with the content and metadata
+        doc = Document(page_content=content, metadata={"source": file_path})
+        documents.append(doc)
     return documents
 
 def create_vector_store(documents: List[Document]):
@@ -0,0 +1,117 @@
+import asyncio
+import time
+import aiohttp
+from aiohttp import web
+from async_fetcher import AsyncFetcher, TokenBucket, parse_retry_after
+from http_cache import HttpCache
+
+
+def test_token_bucket_spaces_requests_at_its_rate():
+    async def take(count):
+        bucket = TokenBucket(rate=20)
+        start = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(take(5)) >= 4 / 20 * 0.9
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+
+
+async def serve(handler, scenario):
+    app = web.Application()
+    app.router.add_get('/page', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await scenario(f"http://127.0.0.1:{port}/page")
+    finally:
+        await runner.cleanup()
+
+
+def fast_fetcher(**kwargs):
+    return AsyncFetcher(default_rate=1000, backoff_base=0.01, **kwargs)
+
+
+def test_retries_429_then_revalidates_from_the_cache(tmp_path):
+    hits = []
+
+    async def handler(request):
+        hits.append(request.headers.get('If-None-Match'))
+        if len(hits) == 1:
+            return web.Response(status=429, headers={'Retry-After': '0'})
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304)
+        return web.Response(body=b'<html>TenZ</html>', headers={'ETag': '"v1"'})
+
+    async def scenario(url):
+        cache = HttpCache(str(tmp_path), max_age=0)
+        async with fast_fetcher(cache=cache) as fetcher:
+            first = await fetcher.fetch(url)
+            second = await fetcher.fetch(url)
+        return first, second
+
+    first, second = asyncio.run(serve(handler, scenario))
+    assert first.status == second.status == 200 and second.body == b'<html>TenZ</html>'
+    assert hits == [None, None, '"v1"']
+
+
+def test_fresh_cache_entries_skip_the_network(tmp_path):
+    async def handler(request):
+        return web.Response(body=b'page')
+
+    async def scenario(url):
+        async with fast_fetcher(cache=HttpCache(str(tmp_path))) as fetcher:
+            await fetcher.fetch(url)
+            await fetcher.fetch(url)
+            return sum(fetcher.request_counts.values())
+
+    assert asyncio.run(serve(handler, scenario)) == 1
+
+
+class FlakySession:
+    """Stands in for aiohttp.ClientSession: drops the first connection, then answers."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, headers=None):
+        self.calls += 1
+        if self.calls == 1:
+            raise aiohttp.ServerDisconnectedError()
+        return FakeResponse()
+
+    async def close(self):
+        pass
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def read(self):
+        return b'ok'
+
+
+def test_connection_errors_are_retried():
+    async def scenario():
+        fetcher = fast_fetcher()
+        fetcher._session = FlakySession()
+        return await fetcher.fetch('http://example.invalid/page'), fetcher._session.calls
+
+    result, calls = asyncio.run(scenario())
+    assert result.status == 200 and calls == 2
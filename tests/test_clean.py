@@ -0,0 +1,34 @@
+import pandas as pd
+from frontend.clean import TextNormaliser, normalise_key
+
+
+def test_normalise_key_folds_accents_case_and_punctuation():
+    assert normalise_key('Leviatán.Kingg') == normalise_key('leviatan kingg') == 'leviatankingg'
+    assert normalise_key(None) == ''
+
+
+def frame():
+    return pd.DataFrame({'handle': ['  Ardiis ', 'nAts', None], 'first_name': ['Ardis', 'Ayaz', 'José'],
+                         'country': ['LATVIA', 'RUSSIA', 'SPAIN'], 'primary_language': ['Latvian', 'RUSSIAN', '']})
+
+
+def test_transform_keeps_case_by_default():
+    cleaned = TextNormaliser().transform(frame())
+    assert cleaned['handle'].tolist() == ['Ardiis', 'nAts', '']
+    assert cleaned['first_name'].tolist()[2] == 'Jose'
+    assert cleaned['country'].tolist() == ['LATVIA', 'RUSSIA', 'SPAIN']
+    assert cleaned['handle_key'].tolist() == ['ardiis', 'nats', '']
+
+
+def test_title_case_labels_is_opt_in():
+    cleaned = TextNormaliser(title_case_labels=True).transform(frame())
+    assert cleaned['country'].tolist() == ['Latvia', 'Russia', 'Spain']
+    assert cleaned['primary_language'].tolist() == ['Latvian', 'Russian', '']
+    assert cleaned['handle'].tolist()[1] == 'nAts'
+
+
+def test_each_distinct_value_is_cleaned_once():
+    normaliser = TextNormaliser(columns=['handle'], key_column=None)
+    normaliser.transform(pd.DataFrame({'handle': ['TenZ'] * 1000 + ['zekken'] * 1000}))
+    normaliser.transform(pd.DataFrame({'handle': ['TenZ', 'Sacy']}))
+    assert normaliser.distinct_values() == 3
@@ -0,0 +1,74 @@
+import pytest
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException
+from driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+        self.visited = []
+
+    def delete_all_cookies(self):
+        pass
+
+    def execute_script(self, script):
+        pass
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def quit(self):
+        self.quit_called = True
+
+
+def make_pool(**kwargs):
+    started = []
+
+    def factory():
+        started.append(FakeDriver())
+        return started[-1]
+
+    return DriverPool(driver_factory=factory, **kwargs), started
+
+
+def test_browser_is_reused_and_reset_between_players():
+    pool, started = make_pool()
+    with pool.driver() as first:
+        first.get('https://www.vlr.gg/player/9/tenz')
+    with pool.driver() as second:
+        pass
+    assert second is first and len(started) == 1
+    assert first.visited[-1] == 'about:blank'
+
+
+def test_browser_is_recycled_after_max_pages():
+    pool, started = make_pool(max_pages=2)
+    for _ in range(3):
+        with pool.driver():
+            pass
+    assert len(started) == 2 and started[0].quit_called
+
+
+def test_page_errors_keep_the_browser_and_session_errors_replace_it():
+    pool, started = make_pool()
+    with pytest.raises(TimeoutException):
+        with pool.driver():
+            raise TimeoutException("no such element in time")
+    assert len(started) == 1 and not started[0].quit_called
+
+    with pytest.raises(InvalidSessionIdException):
+        with pool.driver():
+            raise InvalidSessionIdException("session deleted")
+    assert started[0].quit_called
+    with pool.driver() as driver:
+        assert driver is started[1]
+
+
+def test_close_quits_every_browser():
+    pool, started = make_pool(size=2)
+    pool.warm()
+    pool.close()
+    assert len(started) == 2 and all(driver.quit_called for driver in started)
+    with pytest.raises(RuntimeError):
+        with pool.driver():
+            pass
@@ -0,0 +1,20 @@
+import pandas as pd
+from player_dataset import coerce_player_frame, dedupe_players
+
+
+def test_percent_columns_read_fractions_and_percents_alike():
+    raw = pd.DataFrame({'handle': ['TenZ', 'aimDLL', 'zekken'],
+                        'kill_assists_survived_traded': ['71%', '0.8', ''],
+                        'regions': ['na', 'eu|na', ''], 'igl': ['FALSE', 'TRUE', '']})
+    data = coerce_player_frame(raw, league='valorant challengers')
+    assert data['kill_assists_survived_traded'].tolist()[:2] == [71.0, 80.0]
+    assert pd.isna(data['kill_assists_survived_traded'].iloc[2])
+    assert data['regions'].tolist()[1] == ['eu', 'na']
+    assert data['igl'].tolist()[:2] == [False, True]
+
+
+def test_dedupe_players_keeps_the_last_row_per_league_and_handle_key():
+    players = pd.DataFrame({'handle': ['aimDLL', 'aimdll', 'aimDLL', 'TenZ'],
+                            'league': ['vct', 'vct', 'challengers', 'vct'], 'rating': [1.00, 1.04, 0.9, 1.1]})
+    kept = dedupe_players(players)
+    assert kept['rating'].tolist() == [1.04, 0.9, 1.1]
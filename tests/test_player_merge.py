@@ -0,0 +1,41 @@
+import csv
+from player_merge import PlayerMerger, is_missing
+
+
+def write_source(path, rows):
+    with open(path, 'w', newline='', encoding='latin-1') as file:
+        writer = csv.writer(file)
+        writer.writerow(['handle', 'regions', 'rating'])
+        writer.writerows(rows)
+
+
+def test_na_region_is_a_value_not_missing(tmp_path):
+    older, newer = tmp_path / 'old.csv', tmp_path / 'new.csv'
+    write_source(older, [['TenZ', 'eu', '1.1']])
+    write_source(newer, [['TenZ', 'na', 'NA']])
+
+    merger = PlayerMerger(state_path=None)
+    merger.merge([str(older), str(newer)])
+
+    row = merger.canonical['tenz']
+    assert row['regions'] == 'na'
+    assert row['rating'] == '1.1'  # "NA" still means missing in other columns
+
+
+def test_is_missing_per_column():
+    assert is_missing('na')
+    assert is_missing(' N/A ', 'regions')
+    assert not is_missing('na', 'regions')
+
+
+def test_percentages_are_merged_in_one_unit(tmp_path):
+    older, newer = tmp_path / 'old.csv', tmp_path / 'new.csv'
+    for path, kast in ((older, '71%'), (newer, '0.68')):
+        with open(path, 'w', newline='', encoding='latin-1') as file:
+            writer = csv.writer(file)
+            writer.writerow(['handle', 'kill_assists_survived_traded'])
+            writer.writerow(['TenZ', kast])
+
+    merger = PlayerMerger(state_path=None)
+    merger.merge([str(older), str(newer)])
+    assert merger.canonical['tenz']['kill_assists_survived_traded'] == '68%'
@@ -0,0 +1,55 @@
+import pandas as pd
+from player_prefilter import PlayerFilterIndex
+
+
+def make_index():
+    players = pd.DataFrame([
+        {'handle': 'TenZ', 'org': 'SEN', 'league': 'valorant champions international', 'status': 'active',
+         'gender': 'male', 'igl': False, 'primary_language': 'English', 'regions': ['na'], 'agents': ['jett'],
+         'rating': 1.1},
+        {'handle': 'Boaster', 'org': 'FNC', 'league': 'valorant champions international', 'status': 'active',
+         'gender': 'male', 'igl': True, 'primary_language': 'English', 'regions': ['eu'], 'agents': ['astra'],
+         'rating': 0.9},
+        {'handle': 'ScreaM', 'org': 'All', 'league': 'valorant challengers', 'status': 'active',
+         'gender': 'male', 'igl': False, 'primary_language': 'French/English', 'regions': ['eu'],
+         'agents': ['reyna', 'sova'], 'rating': 1.2},
+        {'handle': 'Mimi', 'org': '(+1)', 'league': 'valorant game changers', 'status': 'archived',
+         'gender': 'female', 'igl': False, 'primary_language': 'Portuguese', 'regions': ['sa'],
+         'agents': ['sage'], 'rating': 1.0},
+    ])
+    for column in ('regions', 'agents'):
+        players[column] = players[column].astype(object)
+    return PlayerFilterIndex(players)
+
+
+def test_select_ands_dimensions_and_ors_values():
+    index = make_index()
+    assert index.count(region='eu') == 2
+    assert index.count(region='eu', language='french') == 1
+    assert index.count(role=['duelist', 'sentinel']) == 3
+    assert list(index.candidates(region='eu')['handle']) == ['ScreaM', 'Boaster']
+
+
+def test_parse_reads_hard_constraints():
+    index = make_index()
+    assert index.parse("active French-speaking EU initiators") == {
+        'status': ['active'], 'language': ['french'], 'region': ['eu'], 'role': ['initiator']}
+    assert index.parse("Players from South America") == {'region': ['sa']}
+    assert index.parse("duelists from Sentinels") == {'role': ['duelist'], 'org': ['SEN']}
+
+
+def test_parse_skips_common_words_and_junk_orgs():
+    index = make_index()
+    assert '(+1)' not in index.bits['org']
+    assert index.parse("All duelists from EU") == {'role': ['duelist'], 'region': ['eu']}
+    assert index.parse("Build a team of EU players") == {'region': ['eu']}
+
+
+def test_context_without_matches_sends_no_pool():
+    index = make_index()
+    columns = ['handle', 'org', 'regions', 'agents']
+    filters, matching, csv_text = index.context("female duelist from SEN", columns=columns)
+    assert filters and matching == 0 and csv_text is None
+
+    filters, matching, csv_text = index.context("EU duelists", columns=columns)
+    assert matching == 1 and csv_text.splitlines()[1].startswith('ScreaM,')
@@ -0,0 +1,48 @@
+import os
+import time
+from response_cache import ResponseCache, response_key
+
+ANSWER = {'output': {'text': 'Pick TenZ'}, 'citations': [], 'ResponseMetadata': {'RequestId': 'x'}}
+
+
+def test_key_ignores_case_spacing_and_trailing_punctuation():
+    first = response_key("Build a team  from NA players?", 'prompt', 'kb', 'model')
+    assert first == response_key("build a team from na players", 'prompt', 'kb', 'model')
+    assert first != response_key("build a team from na players", 'prompt', 'kb', 'model', 'TenZ,SEN')
+
+
+def test_put_and_get_store_only_the_rendered_parts(tmp_path):
+    cache = ResponseCache(str(tmp_path), version='v1')
+    cache.put('key', ANSWER)
+    assert cache.get('key') == {'output': {'text': 'Pick TenZ'}, 'citations': []}
+    assert ResponseCache(str(tmp_path), version='v1').get('key') is not None
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path), version='v1', ttl=0.05)
+    cache.put('key', ANSWER)
+    time.sleep(0.1)
+    assert cache.get('key') is None
+    assert not os.path.exists(tmp_path / 'key.json')
+
+
+def test_least_recently_used_is_evicted_and_hits_do_not_rewrite(tmp_path):
+    cache = ResponseCache(str(tmp_path), version='v1', max_entries=2)
+    cache.put('a', ANSWER)
+    time.sleep(0.01)
+    cache.put('b', ANSWER)
+    before = (tmp_path / 'a.json').read_bytes()
+    time.sleep(0.01)
+    cache.get('a')
+    assert (tmp_path / 'a.json').read_bytes() == before
+
+    # Recency survives a restart through the file mtimes
+    cache = ResponseCache(str(tmp_path), version='v1', max_entries=2)
+    cache.put('c', ANSWER)
+    assert sorted(os.listdir(tmp_path)) == ['a.json', 'c.json']
+
+
+def test_other_dataset_version_drops_entries(tmp_path):
+    ResponseCache(str(tmp_path), version='v1').put('key', ANSWER)
+    cache = ResponseCache(str(tmp_path), version='v2')
+    assert cache.get('key') is None and os.listdir(tmp_path) == []
@@ -0,0 +1,43 @@
+import csv
+from scrape_journal import ScrapeJournal, file_signature, run_scrape_job
+
+
+def write_input(path, handles):
+    with open(path, 'w', newline='', encoding='latin-1') as file:
+        writer = csv.writer(file)
+        writer.writerow(['handle', 'agents'])
+        writer.writerows([handle, ''] for handle in handles)
+
+
+def run(input_csv, output_csv, journal_path, scraped):
+    def scrape(handle):
+        scraped.append(handle)
+        return handle.upper()
+
+    def apply(row, result):
+        row[1] = result
+
+    run_scrape_job(str(input_csv), str(output_csv), str(journal_path), scrape, apply)
+
+
+def test_journal_is_reused_for_the_same_input(tmp_path):
+    input_csv, journal_path = tmp_path / 'in.csv', tmp_path / 'out.csv.journal'
+    write_input(input_csv, ['tenz', 'zekken'])
+    journal = ScrapeJournal(str(journal_path), signature=file_signature(str(input_csv)))
+    journal.record('tenz', 'TENZ')
+    journal.close()
+
+    scraped = []
+    run(input_csv, tmp_path / 'out.csv', journal_path, scraped)
+    assert scraped == ['zekken']
+
+
+def test_journal_is_discarded_when_the_input_changes(tmp_path):
+    input_csv, journal_path = tmp_path / 'in.csv', tmp_path / 'out.csv.journal'
+    write_input(input_csv, ['tenz'])
+    run(input_csv, tmp_path / 'out.csv', journal_path, [])
+
+    write_input(input_csv, ['tenz', 'zekken'])
+    scraped = []
+    run(input_csv, tmp_path / 'out.csv', journal_path, scraped)
+    assert scraped == ['tenz', 'zekken']
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from team_optimiser import MAX_IGLS, ROLES, TeamOptimiser, role_mask
+
+AGENTS = {'duelist': 'jett', 'controller': 'omen', 'initiator': 'sova', 'sentinel': 'killjoy'}
+
+
+def player(handle, role, rating, igl=False, gender='Male', language='English', regions=('na',)):
+    return {
+        'handle': handle, 'org': 'ORG', 'league': 'valorant challengers', 'status': 'active', 'gender': gender,
+        'igl': igl, 'primary_language': language, 'regions': list(regions), 'agents': [AGENTS[role]],
+        'rating': rating, 'average_combat_score': 200 * rating, 'kill_deaths': rating, 'average_damage_per_round': 130.0,
+        'kill_assists_survived_traded': 70.0, 'kills_per_round': 0.7 * rating, 'assists_per_round': 0.3,
+        'first_kills_per_round': 0.1, 'first_deaths_per_round': 0.1, 'headshot_percentage': 25.0,
+        'clutch_success_percentage': 15.0,
+    }
+
+
+def make_optimiser():
+    players = pd.DataFrame([
+        player('Duel', 'duelist', 1.3), player('Duel2', 'duelist', 1.25),
+        player('Smoke', 'controller', 1.0, igl=True), player('Smoke2', 'controller', 1.05, igl=True),
+        player('Info', 'initiator', 1.1), player('Anchor', 'sentinel', 0.9),
+        player('Flex', 'sentinel', 0.95, gender='Female'),
+        player('Faraway', 'duelist', 1.5, regions=('eu',)),
+    ])
+    for column in ('regions', 'agents'):
+        players[column] = players[column].astype(object)
+    return TeamOptimiser(players)
+
+
+def test_rosters_cover_every_role_share_a_region_and_lead_with_the_igl():
+    optimiser = make_optimiser()
+    rosters = optimiser.best_rosters(top=3)
+    assert rosters
+    for roster in rosters:
+        covered = 0
+        for agents in roster.players['agents']:
+            covered |= role_mask(agents)
+        assert covered == (1 << len(ROLES)) - 1
+        assert roster.region == 'na' and 'Faraway' not in roster.handles
+        assert int(roster.players['igl'].sum()) <= MAX_IGLS
+        assert roster.leader in ('Smoke', 'Smoke2')
+    assert [roster.score for roster in rosters] == sorted((roster.score for roster in rosters), reverse=True)
+
+
+def test_required_genders_and_included_players():
+    optimiser = make_optimiser()
+    rosters = optimiser.best_rosters(top=1, require_genders=['Male', 'Female'], include=['anchor'])
+    assert 'Flex' in rosters[0].handles and 'Anchor' in rosters[0].handles
+
+
+def test_invalid_includes_raise_value_error():
+    optimiser = make_optimiser()
+    with pytest.raises(ValueError):
+        optimiser.best_rosters(include=['Duel', 'Duel2', 'Smoke', 'Info', 'Anchor', 'Flex'])
+    with pytest.raises(ValueError):
+        optimiser.best_rosters(include=['Smoke', 'Smoke2'])
@@ -0,0 +1,153 @@
+from typing import Dict, List, Optional
+from html_parse import VLR_PROFILE_STRAINER, make_soup
+
+# The 24-column player schema used by ch_final.csv, gc_final.csv and vct_final.csv
+PLAYER_COLUMNS = [
+    'handle', 'first_name', 'last_name', 'status', 'photo_url', 'org', 'agents', 'rounds_played', 'rating',
+    'average_combat_score', 'kill_deaths', 'kill_assists_survived_traded', 'average_damage_per_round',
+    'kills_per_round', 'assists_per_round', 'first_kills_per_round', 'first_deaths_per_round',
+    'headshot_percentage', 'clutch_success_percentage', 'igl', 'gender', 'country', 'primary_language', 'regions',
+]
+# Columns vlr.gg shows as "71%"; some sources hold the same value as the fraction "0.71"
+PERCENT_COLUMNS = ['kill_assists_survived_traded', 'headshot_percentage', 'clutch_success_percentage']
+
+# Columns of the vlr.gg per-agent table: agent, Use, RND, Rating2.0, ACS, K:D, ADR, KAST, KPR, APR, FKPR, FDPR, ...
+AGENT_TABLE_COLUMNS = {
+    'average_combat_score': 4,
+    'kill_deaths': 5,
+    'average_damage_per_round': 6,
+    'kills_per_round': 8,
+    'assists_per_round': 9,
+    'first_kills_per_round': 10,
+    'first_deaths_per_round': 11,
+}
+ROUNDS_COLUMN = 2
+ONE_DECIMAL_COLUMNS = {'average_combat_score', 'average_damage_per_round'}
+
+
+# Function to write a percentage the way vlr.gg does: "0.71", "71" and "71%" all become "71%"
+def normalise_percent(text: str) -> str:
+    stripped = text.strip()
+    try:
+        number = float(stripped.rstrip('%').replace(',', ''))
+    except ValueError:
+        return text  # Not a number (e.g. "" or "N/A"), leave it to the missing-value rules
+    if not stripped.endswith('%') and number <= 1:
+        number *= 100
+    return f"{number:.10g}%"
+
+# Function to turn a table cell like "1,440", "72%" or "" into a float (None if empty)
+def parse_number(text: str) -> Optional[float]:
+    text = text.strip().replace(',', '').rstrip('%')
+    if not text:
+        return None
+    return float(text)
+
+
+# Function to pull the top agents from the agent image alt texts
+def extract_top_agents(soup, n: int = 3) -> str:
+    img_tags = soup.select('tr img')  # Select all img tags within tr elements
+    alt_texts = [img.get('alt') for img in img_tags if img.get('alt')]  # Extract alt texts
+    return ', '.join(alt_texts[:n])
+
+
+# Function to pull the rating and KAST the same way ratings-scrape.py does
+def extract_rating_kast(soup) -> tuple:
+    rating = soup.find_all('td', class_='mod-center')[0].text.strip()
+    kast = soup.find_all('td', class_='mod-right')[5].text.strip()
+    return rating, kast
+
+
+# Function to pull the country shown under the player's name
+def extract_country(soup) -> Optional[str]:
+    country_element = soup.select_one('div.ge-text-light')
+    if country_element is None:
+        return None
+    return country_element.get_text(strip=True) or None
+
+
+# Function to calculate the average of the 3rd and 7th columns (rating and KAST) of the agent table
+def calculate_column_averages(soup):
+    col_3_values = []
+    col_7_values = []
+
+    # Find all rows and extract data from 3rd and 7th columns
+    for row in soup.find_all('tr'):
+        cols = row.find_all('td')
+        if len(cols) > 7:
+            col_3 = parse_number(cols[3].text)
+            col_7 = parse_number(cols[7].text)
+            if col_3 is not None:
+                col_3_values.append(col_3)
+            if col_7 is not None:
+                col_7_values.append(col_7)
+
+    # Calculate averages
+    avg_col_3 = sum(col_3_values) / len(col_3_values) if col_3_values else 0
+    avg_col_7 = sum(col_7_values) / len(col_7_values) if col_7_values else 0
+    return avg_col_3, avg_col_7
+
+
+# Function to aggregate the per-agent table into career numbers, weighting each agent by rounds played
+def extract_agent_table_stats(soup) -> Dict[str, str]:
+    rows = []
+    for row in soup.find_all('tr'):
+        cols = row.find_all('td')
+        if len(cols) > 11 and row.find('img'):
+            rows.append([col.text for col in cols])
+    if not rows:
+        return {}
+
+    stats = {}
+    rounds = [parse_number(cols[ROUNDS_COLUMN]) or 0 for cols in rows]
+    stats['rounds_played'] = str(int(sum(rounds)))
+    for column, index in AGENT_TABLE_COLUMNS.items():
+        weighted = [(parse_number(cols[index]), weight) for cols, weight in zip(rows, rounds)]
+        weighted = [(value, weight) for value, weight in weighted if value is not None and weight]
+        total_weight = sum(weight for _, weight in weighted)
+        if total_weight:
+            average = sum(value * weight for value, weight in weighted) / total_weight
+            stats[column] = f"{average:.1f}" if column in ONE_DECIMAL_COLUMNS else f"{average:.2f}"
+    return stats
+
+
+# Function to read "Tyson Ngo" from the profile header into first / last name
+def extract_real_name(soup) -> Dict[str, str]:
+    name_element = soup.select_one('h2.player-real-name')
+    if name_element is None:
+        return {}
+    parts = name_element.get_text(strip=True).split(maxsplit=1)
+    if not parts:
+        return {}
+    return {'first_name': parts[0], 'last_name': parts[1] if len(parts) > 1 else ''}
+
+
+def extract_player_profile(page_source: str) -> Dict[str, str]:
+    """Pull every field we scrape from one `?timespan=all` vlr.gg profile page, keyed by schema column."""
+    soup = make_soup(page_source, VLR_PROFILE_STRAINER)
+    profile = {}
+    profile.update(extract_real_name(soup))
+    profile.update(extract_agent_table_stats(soup))
+
+    agents = extract_top_agents(soup)
+    if agents:
+        profile['agents'] = agents
+    try:
+        profile['rating'], profile['kill_assists_survived_traded'] = extract_rating_kast(soup)
+    except IndexError:
+        pass  # Players with no stats table
+    country = extract_country(soup)
+    if country:
+        profile['country'] = country
+
+    return {column: value for column, value in profile.items() if value}
+
+
+# Function to fill only the empty cells of a row from a scraped profile
+def fill_missing(headers: List[str], row: List[str], profile: Dict[str, str]) -> List[str]:
+    filled = []
+    for index, column in enumerate(headers):
+        if index < len(row) and not row[index].strip() and profile.get(column):
+            row[index] = profile[column]
+            filled.append(column)
+    return filled
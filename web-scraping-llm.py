@@ -1,5 +1,6 @@
+import asyncio
 import json
-from typing import List
+from typing import List, Union
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -7,9 +8,11 @@ from langchain_openai import ChatOpenAI
 from langchain.chains import RetrievalQA
 from langchain.docstore.document import Document
 from langchain.prompts import PromptTemplate
-from langchain_community.document_loaders import WebBaseLoader, AsyncHtmlLoader, AsyncChromiumLoader
+from langchain_community.document_loaders import WebBaseLoader, AsyncChromiumLoader
 from langchain_community.document_transformers import Html2TextTransformer
 from bs4 import BeautifulSoup
+from async_fetcher import AsyncFetcher
+from http_cache import FetchResult, HttpCache
 
 
 # Load environment variables (make sure to set OPENAI_API_KEY)
@@ -17,9 +20,25 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
-def load_web_data(url: str) -> List[Document]:
-    loader = AsyncHtmlLoader(url)
-    documents = loader.load()
+# Function to fetch every page concurrently (like AsyncHtmlLoader did), within the per-host rate limits
+async def fetch_pages(urls: List[str], cache: HttpCache, max_in_flight: int = 4) -> List[Union[FetchResult, Exception]]:
+    async with AsyncFetcher(max_in_flight=max_in_flight, cache=cache) as fetcher:
+        return await asyncio.gather(*(fetcher.fetch(page_url) for page_url in urls), return_exceptions=True)
+
+def load_web_data(url: Union[str, List[str]], cache: HttpCache = None) -> List[Document]:
+    # Fetch through the on-disk cache so reruns only revalidate pages that haven't changed
+    cache = cache or HttpCache()
+    urls = [url] if isinstance(url, str) else list(url)
+    documents = []
+    for page_url, response in zip(urls, asyncio.run(fetch_pages(urls, cache))):
+        if isinstance(response, Exception):
+            print(f"Failed to retrieve {page_url}: {response}")
+            continue
+        if response.status != 200:
+            print(f"Failed to retrieve {page_url}. Status code: {response.status}")
+            continue
+        documents.append(Document(page_content=response.body.decode('utf-8', errors='replace'),
+                                  metadata={"source": page_url}))
     print("documents-", documents)
     
     # Process the documents to replace image tags with alt texts